@@ -1,3 +1,6 @@
+from pointgrid import PointGrid
+
+
 TEST1 = """
 .#..#
 .....
@@ -5,19 +8,22 @@ TEST1 = """
 ....#
 ...##"""
 
+ASTEROID = 1
+
 
 def count_visible(x, y, grid):
-    
-    return 0
+    # an asteroid is visible unless another one sits on the line between
+    return sum(
+        1 for (ax, ay), _ in grid.items()
+        if (ax, ay) != (x, y) and next(grid.line(x, y, ax, ay), None) is None
+    )
 
 
 def main():
-    grid = []
-    for line in TEST1.split('\n'):
-        if line.strip():
-            grid.append(list(line.strip()))
-    for row in grid:
-        print(row)
+    lines = [line.strip() for line in TEST1.split('\n') if line.strip()]
+    grid = PointGrid.from_lines(lines, {'#': ASTEROID}, skip='.')
+    print(grid.render({ASTEROID: '#'}, empty='.'))
+    print(max((count_visible(x, y, grid), (x, y)) for (x, y), _ in grid.items()))
 
 
 if __name__ == "__main__":
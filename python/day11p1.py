@@ -5,21 +5,14 @@ from dataclasses import dataclass
 import typing
 from itertools import permutations
 
+from pointgrid import SparseGrid
+
 
 class COLOR(IntEnum):
     BLACK = 0
     WHITE = 1
 
 
-@dataclass
-class Grid:
-    x: int
-    y: int
-
-    def __hash__(self):
-        return hash((self.x, self.y))
-
-
 LEFT = 0
 RIGHT = 1
 
@@ -36,10 +29,15 @@ class PaintRobot:
     PAINT = 0
     TURN = 1
 
+    PAINTED = 2  # flag or'ed into the color of squares that have been painted
+
     def __init__(self):
-        self.current_square = Grid(0, 0)
+        self.x = 0
+        self.y = 0
         self.current_color = COLOR.BLACK
-        self.known_grid = {self.current_square: self.current_color}
+        self.known_grid = SparseGrid()  # hull colors, keeps the painted area's bounds
+        self.known_grid.set(self.x, self.y, self.current_color)
+        self.painted_count = 0
         self.current_direction = 0  # index of DIRECTION
         self.next_action = self.PAINT
 
@@ -61,17 +59,22 @@ class PaintRobot:
             self.current_direction = self.current_direction - 1 if self.current_direction > 0 else 3
         else:
             self.current_direction = self.current_direction + 1 if self.current_direction < 3 else 0
-        
-        self.current_square = Grid(
-            self.current_square.x + self.DIRECTIONS[self.current_direction][0],
-            self.current_square.y + self.DIRECTIONS[self.current_direction][1]
-        )
-        self.current_color = self.known_grid.get(self.current_square, COLOR.BLACK)
-        self.known_grid[self.current_square] = self.current_color
+
+        dx, dy = self.DIRECTIONS[self.current_direction]
+        self.x += dx
+        self.y += dy
+        square = self.known_grid.get(self.x, self.y)
+        if square is None:
+            self.current_color = COLOR.BLACK
+            self.known_grid.set(self.x, self.y, COLOR.BLACK)
+        else:
+            self.current_color = square & 1
 
     def paint(self, color: COLOR):
+        if not self.known_grid.get(self.x, self.y, 0) & self.PAINTED:
+            self.painted_count += 1
         self.current_color = color
-        self.known_grid[self.current_square] = color
+        self.known_grid.set(self.x, self.y, color | self.PAINTED)
 
 
 class OpProgram(list):
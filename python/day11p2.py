@@ -4,6 +4,10 @@ from enum import IntEnum
 from dataclasses import dataclass
 import typing
 from itertools import permutations
+import struct
+import zlib
+
+from pointgrid import SparseGrid
 
 
 class COLOR(IntEnum):
@@ -11,15 +15,6 @@ class COLOR(IntEnum):
     WHITE = 1
 
 
-@dataclass
-class Grid:
-    x: int
-    y: int
-
-    def __hash__(self):
-        return hash((self.x, self.y))
-
-
 LEFT = 0
 RIGHT = 1
 
@@ -36,10 +31,15 @@ class PaintRobot:
     PAINT = 0
     TURN = 1
 
+    PAINTED = 2  # flag or'ed into the color of squares that have been painted
+
     def __init__(self):
-        self.current_square = Grid(0, 0)
+        self.x = 0
+        self.y = 0
         self.current_color = COLOR.WHITE
-        self.known_grid = {self.current_square: self.current_color}
+        self.known_grid = SparseGrid()  # hull colors, keeps the painted area's bounds
+        self.known_grid.set(self.x, self.y, self.current_color)
+        self.painted_count = 0
         self.current_direction = 0  # index of DIRECTION
         self.next_action = self.PAINT
 
@@ -61,28 +61,58 @@ class PaintRobot:
             self.current_direction = self.current_direction - 1 if self.current_direction > 0 else 3
         else:
             self.current_direction = self.current_direction + 1 if self.current_direction < 3 else 0
-        
-        self.current_square = Grid(
-            self.current_square.x + self.DIRECTIONS[self.current_direction][0],
-            self.current_square.y + self.DIRECTIONS[self.current_direction][1]
-        )
-        self.current_color = self.known_grid.get(self.current_square, COLOR.BLACK)
-        self.known_grid[self.current_square] = self.current_color
+
+        dx, dy = self.DIRECTIONS[self.current_direction]
+        self.x += dx
+        self.y += dy
+        square = self.known_grid.get(self.x, self.y)
+        if square is None:
+            self.current_color = COLOR.BLACK
+            self.known_grid.set(self.x, self.y, COLOR.BLACK)
+        else:
+            self.current_color = square & 1
 
     def paint(self, color: COLOR):
+        if not self.known_grid.get(self.x, self.y, 0) & self.PAINTED:
+            self.painted_count += 1
         self.current_color = color
-        self.known_grid[self.current_square] = color
+        self.known_grid.set(self.x, self.y, color | self.PAINTED)
+
+    def grid_rows(self) -> list:
+        # one bytes of 0/1 (black/white) pixels per row, top row first, filled in a
+        # single pass over the painted squares rather than a lookup per pixel
+        min_x, min_y, max_x, max_y = self.known_grid.bounds
+        width = max_x - min_x + 1
+        pixels = bytearray(width * (max_y - min_y + 1))
+        for (x, y), color in self.known_grid.items():
+            if color & 1:
+                pixels[(max_y - y) * width + x - min_x] = 1
+        return [bytes(pixels[i : i + width]) for i in range(0, len(pixels), width)]
 
     def show_grid(self):
-        min_x = min(g.x for g in self.known_grid)
-        max_x = max(g.x for g in self.known_grid)
-        min_y = min(g.y for g in self.known_grid)
-        max_y = max(g.y for g in self.known_grid)
-        for y in range(max_y, min_y - 1, -1):
-            for x in range(min_x, max_x + 1, 1):
-                color = COLOR.BLACK
-                print(".", end="") if self.known_grid.get(Grid(x, y), COLOR.BLACK) == COLOR.BLACK else print("#", end="")
-            print()
+        text = bytes.maketrans(b"\x00\x01", b".#")
+        sys.stdout.write(b"\n".join(row.translate(text) for row in self.grid_rows()).decode() + "\n")
+
+    def write_image(self, path: str):
+        # .pbm (painted squares in black on white) or .png (1 bit greyscale, as painted)
+        rows = self.grid_rows()
+        width, height = len(rows[0]), len(rows)
+        pad = -width % 8
+        bits = bytes.maketrans(b"\x00\x01", b"01")
+        packed = [int(row.translate(bits) + b"0" * pad, 2).to_bytes((width + pad) // 8, 'big') for row in rows]
+        if path.endswith('.pbm'):
+            data = b"P4\n%d %d\n" % (width, height) + b"".join(packed)
+        else:
+            def chunk(kind: bytes, body: bytes) -> bytes:
+                return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+            data = b"".join([
+                b"\x89PNG\r\n\x1a\n",
+                chunk(b"IHDR", struct.pack('>IIBBBBB', width, height, 1, 0, 0, 0, 0)),
+                chunk(b"IDAT", zlib.compress(b"".join(b"\x00" + row for row in packed))),
+                chunk(b"IEND", b""),
+            ])
+        with open(path, 'wb') as f:
+            f.write(data)
 
 
 class OpProgram(list):
@@ -245,6 +275,8 @@ def main():
     #print(o.output_buffer)
     print(len(o.io_robot.known_grid))
     o.io_robot.show_grid()
+    if len(sys.argv) > 1:
+        o.io_robot.write_image(sys.argv[1])
 
 
 if __name__ == "__main__":
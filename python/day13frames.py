@@ -0,0 +1,168 @@
+# 2019 advent of code day 13 game frame recording and playback
+#
+# usage: python day13frames.py record <file>         run the day13p2 game and record it
+#        python day13frames.py play <file> [fps]     replay a recording with curses (fps 0 = flat out)
+#        python day13frames.py summary <file>        frames, tile updates and final score
+#
+# Record format: MAGIC, then one tag byte per event:
+#   tile  0b00000ttt  + zigzag varints dx, dy   (dx relative to the previous tile's x + 1,
+#                                                dy to the previous tile's y, so a row
+#                                                being drawn costs 3 bytes per tile)
+#   score 0b01000000  + zigzag varint score delta
+#   frame 0b10000000  end of frame (the game asked for joystick input)
+import sys
+from time import sleep, perf_counter
+
+from day13p2 import GameScreen, OpMachine, PROGRAM
+
+
+MAGIC = b'AOCF\x01'
+
+TAG_TILE = 0x00
+TAG_SCORE = 0x40
+TAG_FRAME = 0x80
+TAG_MASK = 0xc0
+
+
+def _put_varint(out: bytearray, value: int):
+    value = (value << 1) ^ -(value < 0)
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class FrameWriter:
+
+    def __init__(self, path: str, buffer_size: int = 1 << 16):
+        self.f = open(path, 'wb')
+        self.buffer = bytearray(MAGIC)
+        self.buffer_size = buffer_size
+        self.last_x = -1
+        self.last_y = 0
+        self.last_score = 0
+
+    def tile(self, x: int, y: int, tile: int):
+        self.buffer.append(TAG_TILE | tile)
+        _put_varint(self.buffer, x - self.last_x - 1)
+        _put_varint(self.buffer, y - self.last_y)
+        self.last_x, self.last_y = x, y
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def score(self, value: int):
+        self.buffer.append(TAG_SCORE)
+        _put_varint(self.buffer, value - self.last_score)
+        self.last_score = value
+
+    def frame(self):
+        self.buffer.append(TAG_FRAME)
+
+    def flush(self):
+        self.f.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.f.close()
+
+
+def read_events(path: str):
+    # yields ('tile', x, y, tile), ('score', score) and ('frame',)
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a day 13 frame recording")
+    pos = len(MAGIC)
+    x, y, score = -1, 0, 0
+
+    def varint():
+        nonlocal pos
+        value = 0
+        shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            if not byte & 0x80:
+                return (value >> 1) ^ -(value & 1)
+            shift += 7
+
+    while pos < len(data):
+        tag = data[pos]
+        pos += 1
+        kind = tag & TAG_MASK
+        if kind == TAG_TILE:
+            x += varint() + 1
+            y += varint()
+            yield ('tile', x, y, tag & 0x07)
+        elif kind == TAG_SCORE:
+            score += varint()
+            yield ('score', score)
+        elif kind == TAG_FRAME:
+            yield ('frame',)
+        else:
+            raise ValueError(f"bad tag {tag:#x} at byte {pos - 1}")
+
+
+def record(path: str):
+    o = OpMachine(PROGRAM[:])
+    o.game_screen.recorder = FrameWriter(path)
+    o.run_program()
+    o.game_screen.recorder.close()
+    print(f"score: {o.game_screen.score}")
+
+
+def summary(path: str):
+    frames = tiles = score = 0
+    for event in read_events(path):
+        if event[0] == 'tile':
+            tiles += 1
+        elif event[0] == 'score':
+            score = event[1]
+        else:
+            frames += 1
+    print(f"frames: {frames} tile updates: {tiles} score: {score}")
+
+
+def play(path: str, fps: int):
+    import curses
+
+    def show(stdscr):
+        curses.curs_set(False)
+        stdscr.clear()
+        frame_time = 1 / fps if fps else 0
+        next_frame = perf_counter()
+        for event in read_events(path):
+            if event[0] == 'tile':
+                _, x, y, tile = event
+                stdscr.addstr(y + 1, x, GameScreen.DISPLAY_TILE[tile])
+            elif event[0] == 'score':
+                stdscr.addstr(0, 0, f"SCORE: {event[1]}")
+            elif frame_time:
+                stdscr.refresh()
+                next_frame += frame_time
+                delay = next_frame - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+        stdscr.refresh()
+        sleep(5)
+
+    curses.wrapper(show)
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('record', 'play', 'summary'):
+        print(f"usage: {sys.argv[0]} record|play|summary <file> [fps]")
+        sys.exit(1)
+    command, path = sys.argv[1:3]
+    if command == 'record':
+        record(path)
+    elif command == 'summary':
+        summary(path)
+    else:
+        play(path, int(sys.argv[3]) if len(sys.argv) > 3 else 60)
+
+
+if __name__ == "__main__":
+    main()
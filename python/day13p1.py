@@ -5,6 +5,8 @@ from dataclasses import dataclass
 import typing
 from itertools import permutations
 
+from pointgrid import FrameBuffer
+
 
 @dataclass
 class Grid:
@@ -31,6 +33,7 @@ class GameScreen:
         TILE.BALL: "o",
         TILE.BLOCK: "#"
     }
+    DISPLAY_TABLE = {**DISPLAY_TILE, FrameBuffer.UNDRAWN: DISPLAY_TILE[TILE.EMPTY]}
 
     class MODE(IntEnum):
         X = 0
@@ -38,8 +41,7 @@ class GameScreen:
         TILE = 2
 
     def __init__(self):
-        self.screen = {}
-        self.current_square = Grid(0, 0)
+        self.screen = FrameBuffer()
         self.input_mode = self.MODE.X
         self.next_x = 0
         self.next_y = 0
@@ -54,18 +56,12 @@ class GameScreen:
             if self.next_x == -1:
                 self.score = value
             else:
-                self.screen[Grid(self.next_x, self.next_y)] = value
+                self.screen.set(self.next_x, self.next_y, value)
         self.input_mode = self.input_mode + 1 if self.input_mode < self.MODE.TILE else self.MODE.X
 
     def print_screen(self):
-        max_x = max(g.x for g in self.screen)
-        min_x = 0
-        max_y = max(g.y for g in self.screen)
-        min_y = 0
-        for y in range(min_y, max_y + 1):
-            for x in range(min_x, max_x + 1):
-                print(self.DISPLAY_TILE[self.screen.get(Grid(x, y), 0)], end="")
-            print()
+        for row in self.screen.rows():
+            print(row.decode('latin-1').translate(self.DISPLAY_TABLE))
                 
 
 class OpProgram(list):
@@ -225,7 +221,7 @@ def main():
     o.run_program()
     #print(o.output_buffer)
     #print(o.game_screen.screen)
-    print(list(o.game_screen.screen.values()).count(GameScreen.TILE.BLOCK))
+    print(o.game_screen.screen.count(GameScreen.TILE.BLOCK))
     o.game_screen.print_screen()
 
 
@@ -4,9 +4,13 @@ from enum import IntEnum
 from dataclasses import dataclass
 import typing
 from itertools import permutations
-from os import system
 from collections import defaultdict
 
+from pointgrid import FrameBuffer
+
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+
 
 @dataclass
 class Grid:
@@ -33,6 +37,7 @@ class GameScreen:
         TILE.BALL: "\u25CE",
         TILE.BLOCK: "\u2591"
     }
+    DISPLAY_TABLE = {**DISPLAY_TILE, FrameBuffer.UNDRAWN: DISPLAY_TILE[TILE.EMPTY]}
 
     class MODE(IntEnum):
         X = 0
@@ -40,14 +45,14 @@ class GameScreen:
         TILE = 2
 
     def __init__(self):
-        self.screen = {}
-        self.current_square = Grid(0, 0)
+        self.screen = FrameBuffer()
         self.input_mode = self.MODE.X
         self.next_x = 0
         self.next_y = 0
         self.score = 0
         self._current_ball = Grid(0, 0)
         self._current_paddle = Grid(0, 0)
+        self.recorder = None  # optional day13frames.FrameWriter
 
     def process_data(self, value):
         if self.input_mode == self.MODE.X:
@@ -57,8 +62,12 @@ class GameScreen:
         elif self.input_mode == self.MODE.TILE:
             if self.next_x == -1:
                 self.score = value
+                if self.recorder:
+                    self.recorder.score(value)
             else:
-                self.screen[Grid(self.next_x, self.next_y)] = value
+                self.screen.set(self.next_x, self.next_y, value)
+                if self.recorder:
+                    self.recorder.tile(self.next_x, self.next_y, value)
                 if value == self.TILE.H_PADDLE:
                     self._current_paddle = Grid(self.next_x, self.next_y)
                 elif value == self.TILE.BALL:
@@ -66,16 +75,11 @@ class GameScreen:
         self.input_mode = self.input_mode + 1 if self.input_mode < self.MODE.TILE else self.MODE.X
 
     def print_screen(self):
-        max_x = max(g.x for g in self.screen)
-        min_x = 0
-        max_y = max(g.y for g in self.screen)
-        min_y = 0
-        system('clear')
-        print(f"SCORE: {self.score}")
-        for y in range(min_y, max_y + 1):
-            for x in range(min_x, max_x + 1):
-                print(self.DISPLAY_TILE[self.screen.get(Grid(x, y), 0)], end="")
-            print()
+        # home + clear and the whole frame in a single write
+        rows = [f"SCORE: {self.score}"]
+        rows.extend(row.decode('latin-1').translate(self.DISPLAY_TABLE) for row in self.screen.rows())
+        sys.stdout.write(CLEAR_SCREEN + '\n'.join(rows) + '\n')
+        sys.stdout.flush()
                 
     def ball_position(self):
         return self._current_ball
@@ -137,6 +141,8 @@ class OpMachine:
     def get_input(self, *args) -> int:
         if self.game_screen:
             #self.game_screen.print_screen()
+            if self.game_screen.recorder:
+                self.game_screen.recorder.frame()
             ball_x = self.game_screen.ball_position().x
             paddle_x = self.game_screen.paddle_position().x
             if ball_x < paddle_x:
@@ -232,7 +238,7 @@ def main():
     o.run_program()
     #print(o.output_buffer)
     #print(o.game_screen.screen)
-    #print(list(o.game_screen.screen.values()).count(GameScreen.TILE.BLOCK))
+    #print(o.game_screen.screen.count(GameScreen.TILE.BLOCK))
     #o.game_screen.print_screen()
     o.game_screen.print_screen()
     #print(o.game_screen.score)
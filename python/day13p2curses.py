@@ -5,13 +5,18 @@ from enum import IntEnum
 from dataclasses import dataclass
 import typing
 from itertools import permutations
-from os import system
 import curses
-from time import sleep
+import queue
+import threading
+from time import sleep, monotonic
+
+from pointgrid import FrameBuffer
 
 
 stdscr = curses.initscr()
 
+FPS = 30
+
 @dataclass
 class Grid:
     x: int
@@ -21,6 +26,52 @@ class Grid:
         return hash((self.x, self.y))
 
 
+class CursesRenderer(threading.Thread):
+    # paints the cells changed since the last frame from its own thread, at most `fps`
+    # times a second (0 for no cap), so the VM only ever queues updates and never waits
+    # on the terminal
+
+    def __init__(self, window, fps: int = FPS):
+        super().__init__(daemon=True)
+        self.window = window
+        self.fps = fps
+        self.updates = queue.SimpleQueue()
+
+    def draw(self, y: int, x: int, text: str):
+        self.updates.put((y, x, text))
+
+    def stop(self):
+        self.updates.put(None)
+        self.join()
+
+    def _paint(self, dirty: dict):
+        for (y, x), text in dirty.items():
+            self.window.addstr(y, x, text)
+        dirty.clear()
+        self.window.refresh()
+
+    def run(self):
+        dirty = {}
+        frame_time = 1 / self.fps if self.fps > 0 else 0
+        next_frame = monotonic()
+        while True:
+            timeout = max(0, next_frame - monotonic()) if dirty else None
+            try:
+                update = self.updates.get(timeout=timeout)
+            except queue.Empty:
+                update = ()
+            if update is None:
+                break
+            if update:
+                y, x, text = update
+                dirty[(y, x)] = text
+            now = monotonic()
+            if dirty and now >= next_frame:
+                self._paint(dirty)
+                next_frame = now + frame_time
+        self._paint(dirty)
+
+
 class GameScreen:
 
     class TILE(IntEnum):
@@ -44,12 +95,14 @@ class GameScreen:
         TILE = 2
 
     def __init__(self):
-        self.screen = {}
-        self.current_square = Grid(0, 0)
+        self.screen = FrameBuffer()
         self.input_mode = self.MODE.X
         self.next_x = 0
         self.next_y = 0
         self.score = 0
+        self._current_ball = Grid(0, 0)
+        self._current_paddle = Grid(0, 0)
+        self.renderer = CursesRenderer(stdscr)
 
     def process_data(self, value):
         if self.input_mode == self.MODE.X:
@@ -59,26 +112,25 @@ class GameScreen:
         elif self.input_mode == self.MODE.TILE:
             if self.next_x == -1:
                 self.score = value
-                stdscr.addstr(0, 0, f"SCORE: {self.score}")
+                self.renderer.draw(0, 0, f"SCORE: {self.score}")
             else:
-                self.screen[Grid(self.next_x, self.next_y)] = value
-                stdscr.addch(self.next_y + 1, self.next_x, self.DISPLAY_TILE[value])
+                self.screen.set(self.next_x, self.next_y, value)
+                if value == self.TILE.H_PADDLE:
+                    self._current_paddle = Grid(self.next_x, self.next_y)
+                elif value == self.TILE.BALL:
+                    self._current_ball = Grid(self.next_x, self.next_y)
+                self.renderer.draw(self.next_y + 1, self.next_x, self.DISPLAY_TILE[value])
         self.input_mode = self.input_mode + 1 if self.input_mode < self.MODE.TILE else self.MODE.X
 
     def print_screen(self):
-        stdscr.refresh()
+        # flush whatever is still queued and stop the renderer
+        self.renderer.stop()
                 
     def ball_position(self):
-        for g, v in self.screen.items():
-            if v == self.TILE.BALL:
-                return g
-        return None # this would be bad
+        return self._current_ball
     
     def paddle_position(self):
-        for g, v in self.screen.items():
-            if v == self.TILE.H_PADDLE:
-                return g
-        return None # not good
+        return self._current_paddle
 
 
 class OpProgram(list):
@@ -151,8 +203,6 @@ class OpMachine:
 
     def get_input(self, *args) -> int:
         if self.game_screen:
-            self.game_screen.print_screen()
-            sleep(.005)
             # AI (haha) code
             ball_x = self.game_screen.ball_position().x
             paddle_x = self.game_screen.paddle_position().x
@@ -251,6 +301,9 @@ def main(*args):
     stdscr.clear()
     curses.curs_set(False)
     o = OpMachine(PROGRAM[:])
+    if len(sys.argv) > 1:
+        o.game_screen.renderer.fps = int(sys.argv[1])
+    o.game_screen.renderer.start()
     o.run_program()
 
 
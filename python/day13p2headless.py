@@ -0,0 +1,95 @@
+# 2019 advent of code day 13 part 2 headless, plays the whole game at VM speed
+#
+# usage: python day13p2headless.py [--stats frames.csv] [--render N]
+#   --stats   write per-frame (frame, score, blocks left, ball x, paddle x) rows
+#   --render  attach print_screen as a subscriber every N frames
+import argparse
+from dataclasses import replace
+from time import perf_counter
+
+from day13p2 import GameScreen, OpMachine, PROGRAM
+
+
+class HeadlessGameScreen(GameScreen):
+
+    def __init__(self):
+        super().__init__()
+        self.ball_x = 0
+        self.paddle_x = 0
+        self.frames = 0
+        self.record_stats = False
+        self.frame_stats = []
+        self._subscribers = []
+
+    @property
+    def blocks(self) -> int:
+        return self.screen.count(self.TILE.BLOCK)
+
+    def subscribe(self, callback, every: int = 1):
+        # callback(screen) is called on every `every`th frame
+        self._subscribers.append((every, callback))
+
+    def process_data(self, value):
+        if self.input_mode == self.MODE.X:
+            self.next_x = value
+        elif self.input_mode == self.MODE.Y:
+            self.next_y = value
+        elif self.input_mode == self.MODE.TILE:
+            if self.next_x == -1:
+                self.score = value
+            else:
+                if value == self.TILE.BALL:
+                    self.ball_x = self.next_x
+                elif value == self.TILE.H_PADDLE:
+                    self.paddle_x = self.next_x
+                self.screen.set(self.next_x, self.next_y, value)
+        self.input_mode = self.input_mode + 1 if self.input_mode < self.MODE.TILE else self.MODE.X
+
+    def end_frame(self):
+        self.frames += 1
+        if self.record_stats:
+            self.frame_stats.append((self.frames, self.score, self.blocks, self.ball_x, self.paddle_x))
+        for every, callback in self._subscribers:
+            if self.frames % every == 0:
+                callback(self)
+
+
+class HeadlessOpMachine(OpMachine):
+
+    def __init__(self, program: list):
+        super().__init__(program)
+        self.game_screen = HeadlessGameScreen()
+
+    def get_input(self, *args) -> int:
+        # every joystick request is the end of a frame
+        screen = self.game_screen
+        screen.end_frame()
+        return (screen.ball_x > screen.paddle_x) - (screen.ball_x < screen.paddle_x)
+
+    OPS = {**OpMachine.OPS, 3: replace(OpMachine.OPS[3], func=get_input)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stats', help='write per-frame statistics to this csv file')
+    parser.add_argument('--render', type=int, default=0, help='print the screen every N frames')
+    args = parser.parse_args()
+
+    o = HeadlessOpMachine(PROGRAM[:])
+    o.game_screen.record_stats = bool(args.stats)
+    if args.render:
+        o.game_screen.subscribe(GameScreen.print_screen, every=args.render)
+    start = perf_counter()
+    o.run_program()
+    elapsed = perf_counter() - start
+    screen = o.game_screen
+    if args.stats:
+        with open(args.stats, 'wt') as f:
+            f.write("frame,score,blocks,ball_x,paddle_x\n")
+            f.writelines(','.join(str(v) for v in row) + '\n' for row in screen.frame_stats)
+    print(f"score: {screen.score} blocks left: {screen.blocks} frames: {screen.frames} "
+          f"({elapsed:.3f}s, {screen.frames / elapsed:.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
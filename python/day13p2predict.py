@@ -0,0 +1,130 @@
+# 2019 advent of code day 13 part 2 autopilot with ball trajectory prediction
+#
+# The ball's velocity comes from its position on successive frames. While the ball is
+# coming down the paddle heads for where it will reach the paddle row (bouncing off the
+# walls and the blocks it knows about) and then waits there instead of shadowing the ball
+# every frame; while it is going up the paddle follows it. Each time the ball comes off the
+# paddle the machine is snapshotted; if a prediction turns out wrong and the ball gets
+# past the paddle, the machine is rolled back to that snapshot and plays reactively
+# (paddle follows ball x) until the next hit.
+import copy
+from collections import defaultdict
+from dataclasses import dataclass, replace
+
+from day13p2 import GameScreen, OpMachine, STATE, PROGRAM
+
+
+@dataclass
+class Snapshot:
+    machine: defaultdict
+    pc: int
+    relative_offset: int
+    game_screen: GameScreen
+
+
+def predict_landing(screen: GameScreen, x: int, y: int, dx: int, dy: int, paddle_y: int) -> int:
+    # follow the ball until it is just above the paddle row. Walls and blocks bounce it
+    # (side, then top or bottom, then a corner hit reverses both), a block breaks when it
+    # is hit, and the ball stays put on the frame it bounces, as the game moves it.
+    broken = set()
+
+    def bounces(bx: int, by: int) -> bool:
+        tile = screen.screen.get(bx, by)
+        if tile == GameScreen.TILE.BLOCK and (bx, by) not in broken:
+            broken.add((bx, by))
+            return True
+        return tile == GameScreen.TILE.WALL
+
+    for _ in range(32 * (screen.screen.max_x + screen.screen.max_y + 2)):
+        if y == paddle_y - 1 and dy > 0:
+            return x
+        hit = False
+        if bounces(x + dx, y):
+            dx, hit = -dx, True
+        if bounces(x, y + dy):
+            dy, hit = -dy, True
+        if not hit and bounces(x + dx, y + dy):
+            dx, dy, hit = -dx, -dy, True
+        if not hit:
+            x += dx
+            y += dy
+    return x
+
+
+class PredictingOpMachine(OpMachine):
+
+    def __init__(self, program: list):
+        super().__init__(program)
+        self.reactive = False
+        self.lost = False
+        self.snapshot = None
+        self.rollbacks = 0
+        self.inputs = 0  # paddle inputs, including any replayed after a rollback
+        self.paddle_moves = 0
+        self._last_ball = None
+        self._resumed = False
+
+    def take_snapshot(self):
+        self.snapshot = Snapshot(
+            defaultdict(int, self.machine), self.pc, self.relative_offset, copy.deepcopy(self.game_screen)
+        )
+
+    def restore_snapshot(self):
+        s = self.snapshot
+        self.machine = defaultdict(int, s.machine)
+        self.pc = s.pc
+        self.relative_offset = s.relative_offset
+        self.game_screen = copy.deepcopy(s.game_screen)
+        self._last_ball = None
+        self._resumed = True
+        self.state = STATE.running
+
+    def get_input(self, *args) -> int:
+        screen = self.game_screen
+        ball = screen.ball_position()
+        paddle = screen.paddle_position()
+        if ball.y >= paddle.y:
+            # the ball got past the paddle, stop here so run() can roll back
+            self.lost = True
+            self.state = STATE.waiting_on_input
+            return None
+        self.inputs += 1
+        if self._resumed:
+            self._resumed = False
+        elif self.snapshot is None or (ball.y == paddle.y - 1 and ball.x == paddle.x):
+            self.take_snapshot()
+            self.reactive = False
+        target = ball.x
+        if not self.reactive and self._last_ball is not None:
+            dx, dy = ball.x - self._last_ball.x, ball.y - self._last_ball.y
+            if dx and dy > 0:
+                target = predict_landing(screen, ball.x, ball.y, dx, dy, paddle.y)
+        self._last_ball = ball
+        move = (target > paddle.x) - (target < paddle.x)
+        self.paddle_moves += move != 0
+        return move
+
+    OPS = {**OpMachine.OPS, 3: replace(OpMachine.OPS[3], func=get_input)}
+
+    def run(self):
+        while True:
+            self.lost = False
+            self.run_program()
+            if not self.lost and self.game_screen.screen.count(GameScreen.TILE.BLOCK) == 0:
+                return
+            if self.reactive:
+                raise RuntimeError("lost the ball while playing reactively")
+            self.rollbacks += 1
+            self.restore_snapshot()
+            self.reactive = True
+
+
+def main():
+    o = PredictingOpMachine(PROGRAM[:])
+    o.run()
+    print(f"score: {o.game_screen.score} inputs: {o.inputs} paddle moves: {o.paddle_moves} "
+          f"rollbacks: {o.rollbacks}")
+
+
+if __name__ == "__main__":
+    main()
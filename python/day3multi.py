@@ -0,0 +1,70 @@
+# 2019 advent day 3 for any number of wires
+#
+# usage: python day3multi.py [wire file]
+# Every line of the file is a wire. Segments for each wire are built in a process pool,
+# then all of them go through a single crossing sweep (day3segments), so the crossings of
+# every pair come out of one pass instead of rebuilding routes for each of the N² pairs.
+# Reports the closest and the minimal delay crossing for each pair that crosses, and over
+# all wires.
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+
+from day3segments import build_segments, find_crossings
+
+
+@dataclass
+class PairResult:
+    distance: int = None
+    closest: tuple = None
+    delay: int = None
+    quickest: tuple = None
+
+    def update(self, x: int, y: int, steps: int):
+        distance = abs(x) + abs(y)
+        if self.distance is None or distance < self.distance:
+            self.distance, self.closest = distance, (x, y)
+        if self.delay is None or steps < self.delay:
+            self.delay, self.quickest = steps, (x, y)
+
+
+def _build(args: tuple) -> list:
+    wire, line = args
+    return build_segments(line.strip().split(','), wire)
+
+
+def read_wires(path: str) -> list:
+    with open(path) as f:
+        return [line for line in f.readlines() if line.strip()]
+
+
+def analyse(wires: list, workers: int = None) -> dict:
+    # (wire, wire) -> PairResult for every pair of wires that cross
+    with ProcessPoolExecutor(workers) as pool:
+        segments = list(chain.from_iterable(pool.map(_build, enumerate(wires), chunksize=16)))
+    results = {}
+    for x, y, a, b in find_crossings(segments):
+        pair = (a.wire, b.wire) if a.wire < b.wire else (b.wire, a.wire)
+        if pair not in results:
+            results[pair] = PairResult()
+        results[pair].update(x, y, a.steps_to(x, y) + b.steps_to(x, y))
+    return results
+
+
+def main():
+    wires = read_wires(sys.argv[1] if len(sys.argv) > 1 else 'day3input.txt')
+    results = analyse(wires)
+    for (w1, w2), r in sorted(results.items()):
+        print(f"wires {w1} and {w2}: closest {r.distance} at {r.closest}, fewest steps {r.delay} at {r.quickest}")
+    if results:
+        closest = min(results.items(), key=lambda item: item[1].distance)
+        quickest = min(results.items(), key=lambda item: item[1].delay)
+        print(f"closest crossing: {closest[1].distance} (wires {closest[0][0]} and {closest[0][1]})")
+        print(f"fewest steps: {quickest[1].delay} (wires {quickest[0][0]} and {quickest[0][1]})")
+    else:
+        print(f"no crossings between {len(wires)} wires")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# 2019 advent day 3 with numpy routes
+#
+# Same cell-level routes as day3p2, built as arrays: each move becomes a run of unit
+# deltas (np.repeat), the running sum gives the coordinates and each (x, y) is packed into
+# a single int64 so intersect1d can match cells of the two wires. intersect1d hands back
+# the index of the first occurrence in each wire, which is the step count less one.
+import numpy as np
+
+
+MOVES = {
+    'R': (0, 1),
+    'L': (0, -1),
+    'U': (1, 0),
+    'D': (-1, 0),
+}
+
+COORD_OFFSET = 1 << 30  # keeps packed keys positive and inside an int64
+COORD_MASK = (1 << 31) - 1
+
+
+def build_route(directions: list) -> np.ndarray:
+    # packed location of every step, in order, starting one step from the origin
+    deltas = np.array([MOVES[d[0]] for d in directions], dtype=np.int64).reshape(-1, 2)
+    amounts = np.array([int(d[1:]) for d in directions], dtype=np.int64)
+    steps = np.cumsum(np.repeat(deltas, amounts, axis=0), axis=0)
+    return pack(steps[:, 0], steps[:, 1])
+
+
+def pack(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return ((x + COORD_OFFSET) << 31) | (y + COORD_OFFSET)
+
+
+def unpack(keys: np.ndarray) -> (np.ndarray, np.ndarray):
+    return (keys >> 31) - COORD_OFFSET, (keys & COORD_MASK) - COORD_OFFSET
+
+
+def find_intersections(r1: np.ndarray, r2: np.ndarray) -> (np.ndarray, np.ndarray):
+    # packed crossing locations and the combined steps to first reach each of them
+    points, i1, i2 = np.intersect1d(r1, r2, return_indices=True)
+    return points, i1 + i2 + 2
+
+
+def find_shortest_manhattan_distance(points: np.ndarray) -> int:
+    x, y = unpack(points)
+    return int((np.abs(x) + np.abs(y)).min())
+
+
+def find_shortest_intersection_distance(steps: np.ndarray) -> int:
+    return int(steps.min())
+
+
+def main():
+    with open('day3input.txt') as f:
+        line1, line2 = f.readlines()
+    route1 = build_route(line1.strip().split(','))
+    route2 = build_route(line2.strip().split(','))
+    points, steps = find_intersections(route1, route2)
+    print(find_shortest_manhattan_distance(points))
+    print(find_shortest_intersection_distance(steps))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,25 @@
 # 2019 advent day 3
 
-MOVES = {
-    'R': (lambda x: (x[0], x[1] + 1)),
-    'L': (lambda x: (x[0], x[1] - 1)),
-    'U': (lambda x: (x[0] + 1, x[1])),
-    'D': (lambda x: (x[0] - 1, x[1])),
-}
+from pointgrid import SparseGrid, unpack
 
 
-def build_route(directions: list) -> list:
-    current_location = (0, 0)
-    route = []
+MOVES = {'R': (0, 1), 'L': (0, -1), 'U': (1, 0), 'D': (-1, 0)}
+
+
+def build_route(directions: list) -> SparseGrid:
+    x = y = 0
+    route = SparseGrid()
     for d in directions:
-        direction, amount = d[0], int(d[1:])
-        for _ in range(amount):
-            current_location = MOVES[direction](current_location)
-            route.append(current_location)
+        dx, dy = MOVES[d[0]]
+        for _ in range(int(d[1:])):
+            x += dx
+            y += dy
+            route.set(x, y, 1)
     return route
 
 
-def find_intersections(r1: list, r2: list) -> set:
-    return set(r1).intersection(set(r2))
+def find_intersections(r1: SparseGrid, r2: SparseGrid) -> set:
+    return {unpack(key) for key in r1.cells.keys() & r2.cells.keys()}
 
 
 def find_shortest_manhattan_distance(points: set) -> int:
@@ -1,34 +1,40 @@
 # 2019 advent day 3 part 2
 
-MOVES = {
-    'R': (lambda x: (x[0], x[1] + 1)),
-    'L': (lambda x: (x[0], x[1] - 1)),
-    'U': (lambda x: (x[0] + 1, x[1])),
-    'D': (lambda x: (x[0] - 1, x[1])),
-}
+from pointgrid import SparseGrid, unpack
 
 
-def build_route(directions: list) -> list:
-    current_location = (0, 0)
-    route = []
+MOVES = {'R': (0, 1), 'L': (0, -1), 'U': (1, 0), 'D': (-1, 0)}
+
+
+def build_route(directions: list) -> SparseGrid:
+    # location -> steps taken to first reach it
+    x = y = steps = 0
+    route = SparseGrid()
     for d in directions:
-        direction, amount = d[0], int(d[1:])
-        for _ in range(amount):
-            current_location = MOVES[direction](current_location)
-            route.append(current_location)
+        dx, dy = MOVES[d[0]]
+        for _ in range(int(d[1:])):
+            x += dx
+            y += dy
+            steps += 1
+            if route.get(x, y) is None:
+                route.set(x, y, steps)
     return route
 
 
-def find_intersections(r1: list, r2: list) -> set:
-    return set(r1).intersection(set(r2))
+def find_intersections(r1: SparseGrid, r2: SparseGrid) -> dict:
+    # location -> combined steps, walking the smaller route and looking up the larger
+    if len(r1) > len(r2):
+        r1, r2 = r2, r1
+    cells = r2.cells
+    return {unpack(key): steps + cells[key] for key, steps in r1.cells.items() if key in cells}
 
 
 def find_shortest_manhattan_distance(points: set) -> int:
     return min((abs(p[0]) + abs(p[1])) for p in points)
 
 
-def find_shortest_intersection_distance(points: set, r1: list, r2: list) -> int:
-    return min(r1.index(p) + r2.index(p) + 2 for p in points)
+def find_shortest_intersection_distance(points: dict) -> int:
+    return min(points.values())
 
 
 #R1 = 'R75,D30,R83,U83,L12,D49,R71,U7,L72'
@@ -46,9 +52,7 @@ def main():
 
     print(
         find_shortest_intersection_distance(
-            find_intersections(route1, route2),
-            route1,
-            route2
+            find_intersections(route1, route2)
         )
     )
 
@@ -0,0 +1,138 @@
+# 2019 advent day 3 with wires kept as segments instead of expanded into cells
+#
+# Perpendicular crossings are found with a sweep over x: horizontal segments are active
+# between their end xs (indexed by y in a sorted list) and each vertical segment queries
+# the ys it spans. Wires running over each other along the same line are handled per
+# line. Memory is proportional to the number of moves, not the length of the wires.
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+
+
+MOVES = {
+    'R': (1, 0),
+    'L': (-1, 0),
+    'U': (0, 1),
+    'D': (0, -1),
+}
+
+
+@dataclass
+class Segment:
+    wire: int
+    x0: int
+    y0: int
+    x1: int
+    y1: int
+    steps: int  # steps walked along the wire before this segment
+
+    @property
+    def horizontal(self) -> bool:
+        return self.y0 == self.y1
+
+    @property
+    def lo(self) -> int:
+        return min(self.x0, self.x1) if self.horizontal else min(self.y0, self.y1)
+
+    @property
+    def hi(self) -> int:
+        return max(self.x0, self.x1) if self.horizontal else max(self.y0, self.y1)
+
+    def steps_to(self, x: int, y: int) -> int:
+        return self.steps + abs(x - self.x0) + abs(y - self.y0)
+
+
+def build_segments(directions: list, wire: int = 0) -> list:
+    segments = []
+    x = y = steps = 0
+    for d in directions:
+        direction, amount = d[0], int(d[1:])
+        if not amount:
+            continue
+        dx, dy = MOVES[direction]
+        segments.append(Segment(wire, x, y, x + dx * amount, y + dy * amount, steps))
+        x, y, steps = x + dx * amount, y + dy * amount, steps + amount
+    return segments
+
+
+def _perpendicular_crossings(segments: list):
+    events = []
+    for s in segments:
+        if s.horizontal:
+            events.append((s.lo, 0, s))
+            events.append((s.hi, 2, s))
+        else:
+            events.append((s.x0, 1, s))
+    events.sort(key=lambda e: (e[0], e[1]))
+    ys = []
+    active = {}
+    for x, kind, s in events:
+        if kind == 0:
+            if s.y0 not in active:
+                insort(ys, s.y0)
+                active[s.y0] = []
+            active[s.y0].append(s)
+        elif kind == 2:
+            active[s.y0].remove(s)
+            if not active[s.y0]:
+                del active[s.y0]
+                del ys[bisect_left(ys, s.y0)]
+        else:
+            i = bisect_left(ys, s.lo)
+            while i < len(ys) and ys[i] <= s.hi:
+                for h in active[ys[i]]:
+                    if h.wire != s.wire:
+                        yield x, ys[i], h, s
+                i += 1
+
+
+def _collinear_crossings(segments: list):
+    lines = {}
+    for s in segments:
+        lines.setdefault((s.horizontal, s.y0 if s.horizontal else s.x0), []).append(s)
+    for (horizontal, fixed), line in lines.items():
+        line.sort(key=lambda s: s.lo)
+        active = []
+        for s in line:
+            active = [a for a in active if a.hi >= s.lo]
+            for a in active:
+                if a.wire == s.wire:
+                    continue
+                lo, hi = s.lo, min(a.hi, s.hi)
+                # the best points of an overlap are its ends, or nearest the origin
+                candidates = {lo, hi, min(max(0, lo), hi)}
+                if fixed == 0:
+                    candidates |= {c for c in (-1, 1) if lo <= c <= hi}
+                for c in candidates:
+                    yield (c, fixed, a, s) if horizontal else (fixed, c, a, s)
+            active.append(s)
+
+
+def find_crossings(segments: list):
+    # (x, y, segment, segment) for every point shared by segments of different wires,
+    # not counting the origin where every wire starts
+    for crossing in _perpendicular_crossings(segments):
+        if crossing[0] or crossing[1]:
+            yield crossing
+    for crossing in _collinear_crossings(segments):
+        if crossing[0] or crossing[1]:
+            yield crossing
+
+
+def closest_crossing(segments: list) -> int:
+    return min(abs(x) + abs(y) for x, y, _, _ in find_crossings(segments))
+
+
+def fewest_steps(segments: list) -> int:
+    return min(a.steps_to(x, y) + b.steps_to(x, y) for x, y, a, b in find_crossings(segments))
+
+
+def main():
+    with open('day3input.txt') as f:
+        line1, line2 = f.readlines()
+    segments = build_segments(line1.strip().split(','), 0) + build_segments(line2.strip().split(','), 1)
+    print(closest_crossing(segments))
+    print(fewest_steps(segments))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# 2019 Advent day 4 counted with digit dynamic programming
+#
+# usage: python day4dp.py [min max]
+# Instead of checking every number in the range, count the passwords up to a bound one
+# digit at a time. Digits never decrease, so once a prefix is below the bound the rest of
+# the password only depends on how many digits are left, the last digit, the length of
+# the current run of that digit and whether a valid pair was already seen: that count is
+# cached, which makes ranges of any length (18 digits and beyond) take milliseconds.
+import sys
+from functools import lru_cache
+
+
+MIN = 145852
+MAX = 616942
+
+
+def group_ok(run: int, exact_pair: bool) -> bool:
+    # part 1 needs two adjacent matching digits, part 2 a group of exactly two
+    return run == 2 if exact_pair else run >= 2
+
+
+@lru_cache(maxsize=None)
+def count_suffixes(length: int, prev: int, run: int, found: bool, exact_pair: bool) -> int:
+    # ways to append `length` more digits after `prev` (which ends a run of `run`)
+    if length == 0:
+        return int(found or group_ok(run, exact_pair))
+    total = count_suffixes(length - 1, prev, min(run + 1, 3), found, exact_pair)
+    ended = found or group_ok(run, exact_pair)
+    for digit in range(prev + 1, 10):
+        total += count_suffixes(length - 1, digit, 1, ended, exact_pair)
+    return total
+
+
+def count_upto(bound: int, exact_pair: bool = False) -> int:
+    # passwords between 1 and bound inclusive
+    if bound < 1:
+        return 0
+    digits = [int(d) for d in str(bound)]
+    total = 0
+    for length in range(1, len(digits)):
+        for first in range(1, 10):
+            total += count_suffixes(length - 1, first, 1, False, exact_pair)
+    prev, run, found = 1, 0, False
+    for i, limit in enumerate(digits):
+        remaining = len(digits) - i - 1
+        for digit in range(prev, limit):
+            if i and digit == prev:
+                total += count_suffixes(remaining, digit, min(run + 1, 3), found, exact_pair)
+            else:
+                total += count_suffixes(remaining, digit, 1, found or group_ok(run, exact_pair), exact_pair)
+        if limit < prev:
+            return total
+        if i and limit == prev:
+            run = min(run + 1, 3)
+        else:
+            found = found or group_ok(run, exact_pair)
+            run = 1
+        prev = limit
+    return total + int(found or group_ok(run, exact_pair))
+
+
+def count_range(low: int, high: int, exact_pair: bool = False) -> int:
+    return count_upto(high, exact_pair) - count_upto(low - 1, exact_pair)
+
+
+def main():
+    low, high = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (MIN, MAX)
+    print(count_range(low, high))
+    print(count_range(low, high, exact_pair=True))
+
+
+if __name__ == "__main__":
+    main()
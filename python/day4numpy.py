@@ -0,0 +1,90 @@
+# 2019 Advent day 4 checked a block of numbers at a time with numpy
+#
+# usage: python day4numpy.py [min max]
+# The range is cut into chunks of 10^CHUNK_DIGITS numbers aligned on multiples of that
+# size, so every number in a chunk has the same length and the same leading digits and
+# the trailing digits run through every combination. Each chunk becomes an N x digits
+# uint8 matrix: the trailing columns are copied from one matrix built up front, the
+# leading ones are filled from the chunk's prefix. Rules are predicates taking that matrix
+# and returning one bool per row; each rule only sees the rows that passed the ones
+# before it.
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+
+MIN = 145852
+MAX = 616942
+
+CHUNK_DIGITS = 5
+
+
+def non_decreasing(digits: np.ndarray) -> np.ndarray:
+    return (digits[:, 1:] >= digits[:, :-1]).all(axis=1)
+
+
+def has_adjacent_pair(digits: np.ndarray) -> np.ndarray:
+    return (digits[:, 1:] == digits[:, :-1]).any(axis=1)
+
+
+def has_exact_pair(digits: np.ndarray) -> np.ndarray:
+    # a matching neighbour whose own neighbours on either side don't match
+    same = digits[:, 1:] == digits[:, :-1]
+    padded = np.pad(same, ((0, 0), (1, 1)))
+    return (same & ~padded[:, :-2] & ~padded[:, 2:]).any(axis=1)
+
+
+PART1_RULES = (non_decreasing, has_adjacent_pair)
+PART2_RULES = (non_decreasing, has_exact_pair)
+
+
+@lru_cache(maxsize=None)
+def all_digits(width: int) -> np.ndarray:
+    # every `width` digit string, 0...0 to 9...9, one per row
+    numbers = np.arange(10 ** width, dtype=np.int64)
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return ((numbers[:, None] // powers) % 10).astype(np.uint8)
+
+
+def digit_matrix(start: int, stop: int, chunk_digits: int = CHUNK_DIGITS) -> np.ndarray:
+    # rows for start..stop-1, which have to fall inside one aligned chunk
+    width = len(str(start))
+    k = min(chunk_digits, width)
+    base = start - start % 10 ** k
+    digits = np.empty((10 ** k, width), dtype=np.uint8)
+    digits[:, width - k:] = all_digits(k)
+    digits[:, :width - k] = [int(d) for d in str(base)[:width - k]]
+    return digits[start - base : stop - base]
+
+
+def chunks(low: int, high: int, chunk_digits: int = CHUNK_DIGITS):
+    # (start, stop) pairs covering low..high inclusive, each inside one aligned chunk
+    start = max(low, 1)
+    while start <= high:
+        size = 10 ** min(chunk_digits, len(str(start)))
+        stop = min(high + 1, start - start % size + size)
+        yield start, stop
+        start = stop
+
+
+def count_valid(low: int, high: int, rules: tuple, chunk_digits: int = CHUNK_DIGITS) -> int:
+    total = 0
+    for start, stop in chunks(low, high, chunk_digits):
+        digits = digit_matrix(start, stop, chunk_digits)
+        for rule in rules:
+            digits = digits[rule(digits)]
+            if not len(digits):
+                break
+        total += len(digits)
+    return total
+
+
+def main():
+    low, high = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (MIN, MAX)
+    print(count_valid(low, high, PART1_RULES))
+    print(count_valid(low, high, PART2_RULES))
+
+
+if __name__ == "__main__":
+    main()
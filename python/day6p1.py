@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class SpaceObject:
     objects = dict()
 
@@ -14,11 +17,35 @@ class SpaceObject:
         return cls.objects[name] if name in cls.objects else cls(name)
 
     def compute_orbits(self):
-        return 1 + self.parent.compute_orbits() if self.parent else 0
+        orbits = 0
+        o = self.parent
+        while o:
+            orbits += 1
+            o = o.parent
+        return orbits
+
+    @classmethod
+    def compute_depths(cls) -> dict:
+        # orbit count of every object, breadth first down from the objects orbiting nothing
+        children = {}
+        roots = []
+        for o in cls.objects.values():
+            if o.parent:
+                children.setdefault(o.parent.name, []).append(o)
+            else:
+                roots.append(o)
+        depths = {o.name: 0 for o in roots}
+        queue = deque(roots)
+        while queue:
+            o = queue.popleft()
+            for child in children.get(o.name, ()):
+                depths[child.name] = depths[o.name] + 1
+                queue.append(child)
+        return depths
 
     @classmethod
     def compute_total_orbits(cls):
-        return sum(o.compute_orbits() for o in cls.objects.values())
+        return sum(cls.compute_depths().values())
 
     @classmethod
     def from_str_def(cls, input_str: str):
@@ -1,5 +1,55 @@
+from collections import deque
+
+
+class AncestorIndex:
+    # binary lifting over the orbit tree: up[k][i] is the object 2^k orbits above object i
+    # (a root is its own parent), so common ancestors are found in O(log depth)
+
+    def __init__(self, objects: dict, depths: dict):
+        # depths is in breadth first order, so every parent is numbered before its children
+        self.names = list(depths)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.depth = [depths[name] for name in self.names]
+        parents = [objects[name].parent for name in self.names]
+        self.up = [[i if p is None else self.index[p.name] for i, p in enumerate(parents)]]
+        for _ in range(max(self.depth, default=0).bit_length() - 1):
+            prev = self.up[-1]
+            self.up.append([prev[prev[i]] for i in range(len(prev))])
+
+    def common_ancestor(self, a: int, b: int):
+        # index of the deepest object that both a and b are or orbit, None if unrelated
+        if self.depth[a] < self.depth[b]:
+            a, b = b, a
+        diff = self.depth[a] - self.depth[b]
+        k = 0
+        while diff:
+            if diff & 1:
+                a = self.up[k][a]
+            diff >>= 1
+            k += 1
+        if a == b:
+            return a
+        for level in reversed(self.up):
+            if level[a] != level[b]:
+                a, b = level[a], level[b]
+        a, b = self.up[0][a], self.up[0][b]
+        return a if a == b else None
+
+    def transfer_distance(self, name1: str, name2: str) -> int:
+        # orbital transfers between the objects name1 and name2 are orbiting
+        a, b = self.index[name1], self.index[name2]
+        pa, pb = self.up[0][a], self.up[0][b]
+        if pa == a or pb == b:
+            return -1
+        common = self.common_ancestor(pa, pb)
+        if common is None:
+            return -1
+        return self.depth[pa] + self.depth[pb] - 2 * self.depth[common]
+
+
 class SpaceObject:
     objects = dict()
+    _ancestor_index = None
 
     def __init__(self, name: str):
         self.name = name
@@ -14,14 +64,46 @@ class SpaceObject:
         return cls.objects[name] if name in cls.objects else cls(name)
 
     def compute_orbits(self):
-        return 1 + self.parent.compute_orbits() if self.parent else 0
+        orbits = 0
+        o = self.parent
+        while o:
+            orbits += 1
+            o = o.parent
+        return orbits
+
+    @classmethod
+    def compute_depths(cls) -> dict:
+        # orbit count of every object, breadth first down from the objects orbiting nothing
+        children = {}
+        roots = []
+        for o in cls.objects.values():
+            if o.parent:
+                children.setdefault(o.parent.name, []).append(o)
+            else:
+                roots.append(o)
+        depths = {o.name: 0 for o in roots}
+        queue = deque(roots)
+        while queue:
+            o = queue.popleft()
+            for child in children.get(o.name, ()):
+                depths[child.name] = depths[o.name] + 1
+                queue.append(child)
+        return depths
 
     @classmethod
     def compute_total_orbits(cls):
-        return sum(o.compute_orbits() for o in cls.objects.values())
+        return sum(cls.compute_depths().values())
+
+    @classmethod
+    def ancestor_index(cls) -> AncestorIndex:
+        # built on first use and kept until the orbit map changes
+        if cls._ancestor_index is None:
+            cls._ancestor_index = AncestorIndex(cls.objects, cls.compute_depths())
+        return cls._ancestor_index
 
     @classmethod
     def from_str_def(cls, input_str: str):
+        cls._ancestor_index = None
         if ')' in input_str:
             parent_str, child_str = input_str.split(')')
             o = cls.get_or_create(child_str)
@@ -31,18 +113,16 @@ class SpaceObject:
         return o
 
     def get_all_orbits(self):
-        return [self.parent] + self.parent.get_all_orbits() if self.parent else []
+        orbits = []
+        o = self.parent
+        while o:
+            orbits.append(o)
+            o = o.parent
+        return orbits
 
     @classmethod
     def find_transfer_distance(cls, object1, object2):
-        o1_orbits = object1.get_all_orbits()
-        o2_orbits = object2.get_all_orbits()
-        closest_common = None
-        for xo in o1_orbits:
-            if xo in o2_orbits:
-                closest_common = xo
-                break
-        return -1 if not closest_common else o1_orbits.index(closest_common) + o2_orbits.index(closest_common)
+        return cls.ancestor_index().transfer_distance(object1.name, object2.name)
 
 def main():
     with open('day6input.txt', 'rt') as f:
@@ -0,0 +1,50 @@
+# AoC 2019 day 8 with the image decoded into a numpy array
+#
+# The digits are viewed as uint8 (no copy when they are already bytes), shifted down by
+# ord('0') and reshaped to (layers, height, width) with no per pixel python work. The
+# check counts digits of every layer in one bincount and the merge takes each pixel from
+# the first layer that isn't transparent.
+import numpy as np
+
+from day8p2 import SIF, RAW_DATA
+
+
+TRANSPARENT = 2
+
+
+class NumpySIF(SIF):
+
+    def _process_digits(self, digits):
+        digits = digits.strip()
+        if isinstance(digits, str):
+            digits = digits.encode('ascii')
+        self.pixels = (np.frombuffer(digits, dtype=np.uint8) - ord('0')).reshape(-1, self.height, self.width)
+        # flat per layer view for the printing methods inherited from SIF
+        return self.pixels.reshape(len(self.pixels), -1)
+
+    def digit_counts(self) -> np.ndarray:
+        # (layers, 10) count of each digit in each layer
+        layers = self.layers.astype(np.intp) + 10 * np.arange(len(self.layers))[:, None]
+        return np.bincount(layers.ravel(), minlength=10 * len(self.layers)).reshape(-1, 10)
+
+    def compute_check(self):
+        counts = self.digit_counts()
+        # on a tie the last layer with the fewest zeros wins, as in SIF
+        least = len(counts) - 1 - int(np.argmin(counts[::-1, 0]))
+        return int(counts[least, 1]) * int(counts[least, 2])
+
+    def merge_layers(self):
+        opaque = self.layers != TRANSPARENT
+        first = opaque.argmax(axis=0)
+        merged = np.take_along_axis(self.layers, first[None, :], axis=0)[0]
+        return np.where(opaque.any(axis=0), merged, TRANSPARENT)
+
+
+def main():
+    sif = NumpySIF.from_digit_string(25, 6, RAW_DATA)
+    print(sif.compute_check())
+    sif.print_layer_image(sif.merge_layers())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# AoC 2019 day 8 decoded one layer at a time from a stream
+#
+# usage: python day8stream.py [image file [width height]]
+# The stream is read in fixed size blocks with readinto and cut into layers in one
+# buffer. Each layer is counted with bytes.count for the check and folded into the
+# composite straight away, keeping only the pixels that are still transparent to look at
+# in later layers. Memory is one block, one layer and the composite however many layers
+# the stream has. Without a file the puzzle input from day8p2 is used.
+import io
+import sys
+
+from day8p2 import SIF, RAW_DATA
+
+
+WIDTH = 25
+HEIGHT = 6
+
+TRANSPARENT = ord('2')
+WHITESPACE = b' \t\r\n\x0b\x0c'
+READ_SIZE = 1 << 16
+
+
+def read_layers(stream, size: int):
+    # the same layer buffer is filled and yielded over and over; ASCII whitespace anywhere
+    # in the stream (trailing newline, wrapped lines) is skipped
+    layer = bytearray(size)
+    filled = 0
+    chunk = bytearray(max(size, READ_SIZE))
+    while True:
+        n = stream.readinto(chunk)
+        if not n:
+            break
+        data = chunk[:n].translate(None, WHITESPACE)
+        pos = 0
+        while pos < len(data):
+            take = min(size - filled, len(data) - pos)
+            layer[filled : filled + take] = data[pos : pos + take]
+            filled += take
+            pos += take
+            if filled == size:
+                yield layer
+                filled = 0
+    if filled:
+        raise ValueError(f"image ends part way through a layer ({filled} of {size} pixels)")
+
+
+def decode(stream, width: int, height: int) -> (int, bytearray):
+    # (check, composite image as ascii digits)
+    least_zeros = None
+    check = 0
+    composite = bytearray([TRANSPARENT]) * (width * height)
+    pending = range(width * height)
+    for layer in read_layers(stream, width * height):
+        zeros = layer.count(b'0')
+        # on a tie the last layer with the fewest zeros wins, as in SIF
+        if least_zeros is None or zeros <= least_zeros:
+            least_zeros = zeros
+            check = layer.count(b'1') * layer.count(b'2')
+        if pending:
+            still = []
+            for i in pending:
+                if layer[i] == TRANSPARENT:
+                    still.append(i)
+                else:
+                    composite[i] = layer[i]
+            pending = still
+    return check, composite
+
+
+def main():
+    width, height = (int(sys.argv[2]), int(sys.argv[3])) if len(sys.argv) > 3 else (WIDTH, HEIGHT)
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            check, composite = decode(f, width, height)
+    else:
+        check, composite = decode(io.BytesIO(RAW_DATA.encode('ascii')), width, height)
+    print(check)
+    SIF(width, height).print_layer_image([d - ord('0') for d in composite])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# 2019 advent of code day 9 intcode machine with memoization of pure subroutines
+#
+# Subroutines are found with the static control flow graph (intcodedisasm). Each call is
+# traced: an invocation is pure if every value it reads before writing is either in its
+# own stack frame (the arguments) or in memory that has never been written (code and
+# constants), and it does no I/O. Pure results are cached in an LRU keyed by
+# (entry pc, argument values) and replayed on the next call with the same arguments.
+# A write to any address a cached result depends on invalidates that subroutine's cache.
+#
+# Calling convention assumed (as emitted by the intcode compiler): [rb+0] at entry holds
+# the return address and the callee's frame is [rb+1 .. rb+frame_size], frame_size being
+# the amount of the `arb` at its entry. Scratch above the frame is treated as dead
+# after the return, so it is not replayed on a cache hit.
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from day9p1 import OpMachine, PMODE, STATE, PROGRAM
+from intcodedisasm import ControlFlowGraph
+
+
+@dataclass
+class Invocation:
+    entry: int
+    base: int
+    frame_size: int
+    return_address: int
+    args: dict = field(default_factory=dict)       # frame offset -> value read before written
+    written: dict = field(default_factory=dict)    # address -> last value written
+    code_reads: set = field(default_factory=set)   # unwritten addresses below the frame read
+    pure: bool = True
+
+    def read(self, address: int, value: int, written_ever: set):
+        if address in self.written:
+            return
+        offset = address - self.base
+        if 0 < offset <= self.frame_size:
+            self.args.setdefault(offset, value)
+        elif offset == 0:
+            pass  # the return address, only used by the return jump
+        elif offset < 0 and address not in written_ever:
+            self.code_reads.add(address)
+        else:
+            self.pure = False
+
+    def effects(self) -> tuple:
+        # (frame relative?, address or offset, value) for every write visible to the caller
+        result = []
+        for address, value in self.written.items():
+            offset = address - self.base
+            if offset < 0:
+                result.append((False, address, value))
+            elif offset <= self.frame_size:
+                result.append((True, offset, value))
+        return tuple(result)
+
+
+@dataclass
+class MemoEntry:
+    arg_offsets: tuple
+    effects: tuple
+    code_reads: frozenset
+
+
+class MemoOpMachine(OpMachine):
+
+    def __init__(self, program: list, memo_size: int = 4096):
+        super().__init__(program)
+        self.memo_size = memo_size
+        self.memo = OrderedDict()  # (entry, arg values) -> MemoEntry
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.memo_impure = 0
+        self._arg_offsets = {}  # entry -> sorted tuple of argument frame offsets
+        self._watch = {}  # address -> set of entries whose cached results read it
+        self._written_ever = set()
+        self._traces = []
+        self._frames = {
+            entry: sub.frame_size
+            for entry, sub in ControlFlowGraph(program).subroutines.items()
+            if sub.frame_size > 0 and sub.returns
+        }
+
+    def _read(self, address: int) -> int:
+        value = self.machine[address]
+        if self._traces:
+            self._traces[-1].read(address, value, self._written_ever)
+        return value
+
+    def _write(self, address: int, value: int):
+        self.machine[address] = value
+        self._written_ever.add(address)
+        if self._traces:
+            self._traces[-1].written[address] = value
+        if address in self._watch:
+            for entry in self._watch.pop(address):
+                self._forget(entry)
+
+    def _forget(self, entry: int):
+        for key in [k for k in self.memo if k[0] == entry]:
+            del self.memo[key]
+
+    def _enter(self) -> bool:
+        # called with pc at a subroutine entry, returns True if the call was answered from cache
+        entry, base = self.pc, self.relative_offset
+        arg_offsets = self._arg_offsets.get(entry)
+        if arg_offsets is not None:
+            key = (entry, tuple(self.machine[base + o] for o in arg_offsets))
+            cached = self.memo.get(key)
+            if cached is not None:
+                self.memo.move_to_end(key)
+                self.memo_hits += 1
+                if self._traces:
+                    parent = self._traces[-1]
+                    for o in arg_offsets:
+                        parent.read(base + o, self.machine[base + o], self._written_ever)
+                    for address in cached.code_reads:
+                        parent.read(address, self.machine[address], self._written_ever)
+                for relative, where, value in cached.effects:
+                    self._write(base + where if relative else where, value)
+                self.pc = self.machine[base]
+                return True
+        self.memo_misses += 1
+        self._traces.append(Invocation(entry, base, self._frames[entry], self.machine[base]))
+        return False
+
+    def _leave(self):
+        trace = self._traces.pop()
+        if self._traces:
+            parent = self._traces[-1]
+            parent.pure = parent.pure and trace.pure
+            for offset, value in trace.args.items():
+                parent.read(trace.base + offset, value, self._written_ever)
+            for address in trace.code_reads:
+                parent.read(address, self.machine[address], self._written_ever)
+            parent.written.update(trace.written)
+        if not trace.pure or trace.code_reads & self._written_ever:
+            self.memo_impure += 1
+            return
+        known = self._arg_offsets.get(trace.entry, ())
+        arg_offsets = tuple(sorted(set(known) | set(trace.args)))
+        if arg_offsets != known:
+            self._arg_offsets[trace.entry] = arg_offsets
+            self._forget(trace.entry)
+        values = []
+        for o in arg_offsets:
+            if o in trace.args:
+                values.append(trace.args[o])
+            elif trace.base + o in trace.written:
+                return  # value at entry is no longer known
+            else:
+                values.append(self.machine[trace.base + o])
+        key = (trace.entry, tuple(values))
+        self.memo[key] = MemoEntry(arg_offsets, trace.effects(), frozenset(trace.code_reads))
+        if len(self.memo) > self.memo_size:
+            self.memo.popitem(last=False)
+        for address in trace.code_reads:
+            self._watch.setdefault(address, set()).add(trace.entry)
+
+    def run_program(self):
+        opcode = 0
+        self.state = STATE.running
+        while opcode != 99 and not self.state == STATE.waiting_on_input:
+            if self.pc in self._frames and self._enter():
+                continue
+            opcode, param_modes = self.decode_opcode(self._read(self.pc))
+            op = self.OPS[opcode]
+            raw_params = [self._read(self.pc + x) for x in range(1, op.num_params + 1)]
+            num_inputs = op.num_params - 1 if op.stores_result else op.num_params
+            passed_params = []
+            for p, mode in zip(raw_params[:num_inputs], param_modes):
+                if mode == PMODE.RELATIVE:
+                    passed_params.append(self._read(p + self.relative_offset))
+                elif mode == PMODE.IMMEDIATE:
+                    passed_params.append(p)
+                else:
+                    passed_params.append(self._read(p))
+            if op.stores_result:
+                target = raw_params[-1] + (self.relative_offset if param_modes[-1] == PMODE.RELATIVE else 0)
+            if opcode in (3, 4) and self._traces:
+                self._traces[-1].pure = False
+            if self.debug:
+                print(f"{self.pc} | {op} | {passed_params}")
+            result = op.func(self, *passed_params)
+            if op.stores_result and self.state != STATE.waiting_on_input:
+                self._write(target, result)
+            if op.can_jump and result:
+                self.pc = passed_params[-1]
+            elif self.state != STATE.waiting_on_input:
+                self.pc += op.num_params + 1
+            if self._traces:
+                trace = self._traces[-1]
+                if self.pc == trace.return_address and self.relative_offset == trace.base:
+                    self._leave()
+
+
+def main():
+    mode = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    o = MemoOpMachine(PROGRAM[:])
+    o.interactive_mode = False
+    o.input_buffer = [mode]
+    o.run_program()
+    print(o.output_buffer)
+    print(f"memo hits: {o.memo_hits} misses: {o.memo_misses} impure: {o.memo_impure}")
+
+
+if __name__ == "__main__":
+    main()
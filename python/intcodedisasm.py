@@ -0,0 +1,394 @@
+# 2019 advent of code intcode disassembler and control flow graph (days 2 - 13)
+#
+# usage: python intcodedisasm.py <day module> [input values...]
+#   e.g. python intcodedisasm.py day13p1
+#        python intcodedisasm.py day9p1 2     (profile with input 2 and show block hotness)
+# note: day2p1 runs its program at import time, use day2p2 for the day 2 PROGRAM
+import sys
+import importlib
+from enum import IntEnum
+from dataclasses import dataclass, field
+import typing
+
+
+class PMODE(IntEnum):
+    POSITION = 0
+    IMMEDIATE = 1
+    RELATIVE = 2
+
+
+# opcode -> (mnemonic, num_params, stores_result)
+OPCODES = {
+    1: ('add', 3, True),
+    2: ('mul', 3, True),
+    3: ('in', 1, True),
+    4: ('out', 1, False),
+    5: ('jit', 2, False),
+    6: ('jif', 2, False),
+    7: ('lt', 3, True),
+    8: ('eq', 3, True),
+    9: ('arb', 1, False),
+    99: ('halt', 0, False),
+}
+
+JUMPS = (5, 6)
+
+
+@dataclass
+class Instruction:
+    address: int
+    opcode: int
+    modes: list
+    params: list
+
+    @property
+    def size(self) -> int:
+        return len(self.params) + 1
+
+    @property
+    def next_address(self) -> int:
+        return self.address + self.size
+
+    @property
+    def mnemonic(self) -> str:
+        return OPCODES[self.opcode][0]
+
+    @property
+    def stores_result(self) -> bool:
+        return OPCODES[self.opcode][2]
+
+    @property
+    def is_jump(self) -> bool:
+        return self.opcode in JUMPS
+
+    @property
+    def always_jumps(self) -> bool:
+        if not self.is_jump or self.modes[0] != PMODE.IMMEDIATE:
+            return False
+        return bool(self.params[0]) if self.opcode == 5 else not self.params[0]
+
+    @property
+    def never_jumps(self) -> bool:
+        if not self.is_jump or self.modes[0] != PMODE.IMMEDIATE:
+            return False
+        return not self.params[0] if self.opcode == 5 else bool(self.params[0])
+
+    @property
+    def jump_target(self) -> typing.Optional[int]:
+        # only immediate targets are known statically
+        if self.is_jump and self.modes[1] == PMODE.IMMEDIATE:
+            return self.params[1]
+        return None
+
+    @property
+    def is_return(self) -> bool:
+        # jump to the address stored at the bottom of the current stack frame
+        return self.always_jumps and self.modes[1] == PMODE.RELATIVE and self.params[1] == 0
+
+    @property
+    def is_terminator(self) -> bool:
+        return self.opcode == 99 or self.always_jumps or (self.is_jump and not self.never_jumps)
+
+    def pushed_constant(self) -> typing.Optional[int]:
+        # value written to [rb+0] if this is `add`/`mul` of two immediates, which is how
+        # the intcode compiler pushes a return address before a call
+        if self.opcode not in (1, 2) or self.modes != [PMODE.IMMEDIATE, PMODE.IMMEDIATE, PMODE.RELATIVE]:
+            return None
+        if self.params[2] != 0:
+            return None
+        a, b = self.params[0], self.params[1]
+        return a + b if self.opcode == 1 else a * b
+
+    @staticmethod
+    def format_param(value: int, mode: int) -> str:
+        if mode == PMODE.IMMEDIATE:
+            return f"{value}"
+        elif mode == PMODE.RELATIVE:
+            return f"[rb{value:+d}]"
+        return f"[{value}]"
+
+    def __str__(self):
+        args = ', '.join(self.format_param(p, m) for p, m in zip(self.params, self.modes))
+        return f"{self.address:6d}: {self.mnemonic:4s} {args}"
+
+
+def decode(program: list, address: int) -> typing.Optional[Instruction]:
+    if address < 0 or address >= len(program):
+        return None
+    value = program[address]
+    opcode = value % 100
+    if value < 0 or opcode not in OPCODES:
+        return None
+    num_params = OPCODES[opcode][1]
+    mode_digits = value // 100
+    modes = []
+    for _ in range(num_params):
+        modes.append(mode_digits % 10)
+        mode_digits //= 10
+    if mode_digits or any(m not in (0, 1, 2) for m in modes):
+        return None
+    if OPCODES[opcode][2] and modes[-1] == PMODE.IMMEDIATE:
+        return None
+    params = program[address + 1 : address + num_params + 1]
+    if len(params) < num_params:
+        return None
+    return Instruction(address, opcode, modes, list(params))
+
+
+@dataclass
+class BasicBlock:
+    start: int
+    instructions: list = field(default_factory=list)
+    successors: list = field(default_factory=list)
+    predecessors: list = field(default_factory=list)
+    call_target: typing.Optional[int] = None
+    indirect: bool = False
+    hotness: int = 0
+
+    @property
+    def end(self) -> int:
+        return self.instructions[-1].next_address
+
+    @property
+    def last(self) -> Instruction:
+        return self.instructions[-1]
+
+
+@dataclass
+class Subroutine:
+    entry: int
+    blocks: list = field(default_factory=list)
+    call_sites: list = field(default_factory=list)
+    frame_size: int = 0
+    returns: bool = False
+    hotness: int = 0
+
+
+class ControlFlowGraph:
+
+    def __init__(self, program: list, entry: int = 0):
+        self.program = program
+        self.entry = entry
+        self.instructions = {}
+        self.blocks = {}
+        self.calls = {}  # call instruction address -> (target, return address)
+        self.subroutines = {}
+        self.stops = []  # (address, reason) wherever discovery could not follow the code
+        self._discover()
+        self._build_blocks()
+        self._find_subroutines()
+
+    def _call_info(self, instruction: Instruction):
+        # `push ret; jmp target` where the pushed value is a code address
+        if not instruction.always_jumps or instruction.jump_target is None:
+            return None
+        previous = self.instructions.get(instruction.address - 4)
+        if previous is None:
+            return None
+        return_address = previous.pushed_constant()
+        if return_address is None:
+            return None
+        return instruction.jump_target, return_address
+
+    def _discover(self):
+        leaders = {self.entry}
+        pending = [self.entry]
+        seen = set()
+        while pending:
+            address = pending.pop()
+            while address not in seen:
+                instruction = decode(self.program, address)
+                if instruction is None:
+                    self.stops.append((address, "cell does not decode"))
+                    break
+                seen.add(address)
+                self.instructions[address] = instruction
+                if not instruction.is_terminator:
+                    address = instruction.next_address
+                    continue
+                if instruction.opcode == 99 or instruction.is_return:
+                    break
+                call = self._call_info(instruction)
+                if call:
+                    self.calls[address] = call
+                    targets = list(call)
+                else:
+                    targets = [instruction.jump_target] if instruction.jump_target is not None else []
+                    if instruction.jump_target is None:
+                        self.stops.append((address, "computed jump"))
+                    if not instruction.always_jumps:
+                        targets.append(instruction.next_address)
+                for target in targets:
+                    leaders.add(target)
+                    pending.append(target)
+                break
+        self._leaders = leaders
+
+    def _build_blocks(self):
+        for start in sorted(self._leaders):
+            if start not in self.instructions:
+                continue
+            block = BasicBlock(start)
+            address = start
+            while address in self.instructions:
+                instruction = self.instructions[address]
+                block.instructions.append(instruction)
+                address = instruction.next_address
+                if instruction.is_terminator or address in self._leaders:
+                    break
+            last = block.last
+            if last.address in self.calls:
+                block.call_target, return_address = self.calls[last.address]
+                block.successors.append(return_address)
+            elif last.opcode == 99 or last.is_return:
+                pass
+            elif last.is_jump and not last.never_jumps:
+                if last.jump_target is None:
+                    block.indirect = True
+                else:
+                    block.successors.append(last.jump_target)
+                if not last.always_jumps:
+                    block.successors.append(last.next_address)
+            else:
+                block.successors.append(address)
+            self.blocks[start] = block
+        for block in self.blocks.values():
+            block.successors = [s for s in block.successors if s in self.blocks]
+            for s in block.successors:
+                self.blocks[s].predecessors.append(block.start)
+
+    def _find_subroutines(self):
+        for call_address, (target, _) in self.calls.items():
+            if target not in self.blocks:
+                continue
+            if target not in self.subroutines:
+                first = self.blocks[target].instructions[0]
+                frame_size = first.params[0] if first.opcode == 9 and first.modes[0] == PMODE.IMMEDIATE else 0
+                self.subroutines[target] = Subroutine(target, frame_size=frame_size)
+            self.subroutines[target].call_sites.append(call_address)
+        for entry, sub in self.subroutines.items():
+            pending = [entry]
+            seen = set()
+            while pending:
+                start = pending.pop()
+                if start in seen:
+                    continue
+                seen.add(start)
+                block = self.blocks[start]
+                sub.returns = sub.returns or block.last.is_return
+                pending.extend(block.successors)
+            sub.blocks = sorted(seen)
+
+    def linear_sweep(self):
+        # (address, Instruction or None for a data cell) over every cell discovery did not
+        # reach, decoding straight through like a plain disassembler would
+        covered = set()
+        for instruction in self.instructions.values():
+            covered.update(range(instruction.address, instruction.next_address))
+        address = 0
+        while address < len(self.program):
+            if address in covered:
+                address += 1
+                continue
+            instruction = decode(self.program, address)
+            if instruction is None or covered & set(range(address, instruction.next_address)):
+                yield address, None
+                address += 1
+            else:
+                yield address, instruction
+                address = instruction.next_address
+
+    def block_containing(self, address: int) -> typing.Optional[BasicBlock]:
+        for block in self.blocks.values():
+            if block.start <= address < block.end:
+                return block
+        return None
+
+    def annotate(self, counts: dict):
+        # counts maps instruction address -> times executed (see profile())
+        for block in self.blocks.values():
+            block.hotness = counts.get(block.start, 0)
+        for sub in self.subroutines.values():
+            sub.hotness = counts.get(sub.entry, 0)
+
+    def dump(self, out=sys.stdout):
+        for address, reason in self.stops:
+            print(f"warning: discovery stopped at {address}: {reason}", file=out)
+        names = {entry: f"sub_{entry}" for entry in self.subroutines}
+        for start in sorted(self.blocks):
+            block = self.blocks[start]
+            if start in names:
+                sub = self.subroutines[start]
+                print(f"\n{names[start]}:  frame={sub.frame_size} callers={len(sub.call_sites)} "
+                      f"blocks={len(sub.blocks)} calls={sub.hotness}", file=out)
+            print(f"block_{start}:  hot={block.hotness} preds={block.predecessors}", file=out)
+            for instruction in block.instructions:
+                note = ''
+                if instruction.address in self.calls:
+                    note = f"    ; call {names.get(block.call_target, block.call_target)}"
+                elif instruction.is_return:
+                    note = "    ; return"
+                print(f"{instruction}{note}", file=out)
+            if block.indirect:
+                print("        -> ?", file=out)
+            elif block.successors:
+                print(f"        -> {', '.join(f'block_{s}' for s in block.successors)}", file=out)
+        if self.stops:
+            self.dump_sweep(out)
+
+    def dump_sweep(self, out=sys.stdout):
+        print("\nnot reached from the entry (linear sweep):", file=out)
+        data = []
+
+        def flush():
+            if data:
+                print(f"{data[0]:6d}: data {', '.join(str(self.program[a]) for a in data)}", file=out)
+                data.clear()
+
+        for address, instruction in self.linear_sweep():
+            if instruction is not None:
+                flush()
+                print(f"{instruction}", file=out)
+                continue
+            if data and (address != data[-1] + 1 or len(data) == 8):
+                flush()
+            data.append(address)
+        flush()
+
+def profile(program: list, inputs: list) -> dict:
+    # run the program on the day 9 machine (which supports every opcode) counting
+    # how many times each instruction address is executed
+    from day9p1 import OpMachine, STATE
+
+    counts = {}
+
+    class ProfilingOpMachine(OpMachine):
+        def decode_opcode(self, value: int) -> (int, list):
+            counts[self.pc] = counts.get(self.pc, 0) + 1
+            return super().decode_opcode(value)
+
+    o = ProfilingOpMachine(program[:])
+    o.interactive_mode = False
+    o.input_buffer = list(inputs)
+    o.run_program()
+    if o.state == STATE.waiting_on_input:
+        print(f"(profile stopped waiting on input at {o.pc})", file=sys.stderr)
+    return counts
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} <day module> [input values...]")
+        sys.exit(1)
+    program = importlib.import_module(sys.argv[1]).PROGRAM[:]
+    cfg = ControlFlowGraph(program)
+    if len(sys.argv) > 2:
+        cfg.annotate(profile(program, [int(x) for x in sys.argv[2:]]))
+    cfg.dump()
+    print(f"\n{len(cfg.instructions)} instructions, {len(cfg.blocks)} blocks, "
+          f"{len(cfg.subroutines)} subroutines, {len(cfg.calls)} call sites"
+          + (f", discovery stopped {len(cfg.stops)} times" if cfg.stops else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# 2019 advent of code intcode offline optimizer
+#
+# usage: python intcodeopt.py <day module> [address=value ...] [observe=address ...]
+#        python intcodeopt.py check
+#   e.g. python intcodeopt.py day2p2 1=12 2=2
+#        python intcodeopt.py day13p2 0=2
+#
+# With the fixed inputs patched in, everything up to the first in/out/halt is constant,
+# so it is evaluated here instead of at run time. The emitted program starts with a
+# short stub that restores only the cells of the stub area that are still read
+# afterwards (dropping every other write made by the prefix), sets the relative base and
+# jumps to where the prefix stopped. The result runs on the unchanged OpMachine.
+#
+# day2 folds completely: the output is the halt stub plus the observed cells (cell 0
+# unless observe= says otherwise). day13 folds its screen setup. day9 is refused (its
+# compiled code jumps through computed addresses) and day5/day7 start with an input, so
+# there is nothing to fold. `check` runs the programs in CHECKS both ways and compares.
+import sys
+import importlib
+
+from intcodedisasm import PMODE, ControlFlowGraph, decode
+
+
+class OptimizeError(Exception):
+    pass
+
+
+def evaluate_prefix(image: list, max_steps: int):
+    # run until the first instruction whose effect is not known at compile time
+    pc = 0
+    rb = 0
+    steps = 0
+    while steps < max_steps:
+        instruction = decode(image, pc)
+        if instruction is None or instruction.opcode in (3, 4, 99):
+            break
+        values = []
+        for p, mode in zip(instruction.params, instruction.modes):
+            if mode == PMODE.IMMEDIATE:
+                values.append(p)
+            else:
+                address = p + rb if mode == PMODE.RELATIVE else p
+                if address < 0:
+                    raise OptimizeError(f"negative address {address} at {pc}")
+                values.append(image[address] if address < len(image) else 0)
+        opcode = instruction.opcode
+        if opcode == 9:
+            rb += values[0]
+            pc += 2
+        elif instruction.is_jump:
+            jump = bool(values[0]) if opcode == 5 else not values[0]
+            pc = values[1] if jump else pc + 3
+        else:
+            a, b = values[0], values[1]
+            result = {1: a + b, 2: a * b, 7: int(a < b), 8: int(a == b)}[opcode]
+            target = instruction.params[2] + (rb if instruction.modes[2] == PMODE.RELATIVE else 0)
+            if target < 0:
+                raise OptimizeError(f"negative address {target} at {pc}")
+            if target >= len(image):
+                image.extend([0] * (target + 1 - len(image)))
+            image[target] = result
+            pc += 4
+        steps += 1
+    return pc, rb, steps
+
+
+def build_stub(image: list, resume: int, rb: int, halts: bool, live: set, code: set) -> list:
+    setup = [109, rb] if rb else []
+    restores = []
+    while True:
+        body = 4 * len(restores) + len(setup)
+        # no jump needed when the stub ends right where the program carries on
+        tail = [99] if halts else [] if resume == body else [1105, 1, resume]
+        size = body + len(tail)
+        needed = sorted(a for a in live if a < size)
+        if len(needed) == len(restores):
+            break
+        restores = needed
+    stub = []
+    for i, address in enumerate(restores):
+        # a restore must not overwrite a stub instruction that has not run yet
+        if address // 4 > i and address < 4 * len(restores):
+            raise OptimizeError(f"cell {address} is overwritten before it runs")
+        stub.extend([1101, image[address], 0, address])
+    stub.extend(setup + tail)
+    for address in range(len(restores) * 4, len(stub)):
+        if address in live and image[address] != stub[address]:
+            raise OptimizeError(f"live cell {address} is needed by the stub")
+    if code & set(range(len(stub))):
+        raise OptimizeError("stub overlaps code still reachable after the prefix")
+    return stub
+
+
+def optimize(program: list, patches: dict = None, observed=(0,), max_steps: int = 1000000):
+    # observed cells keep their final value, by default cell 0 where day 2 leaves its answer
+    image = program[:]
+    for address, value in (patches or {}).items():
+        image[address] = value
+    resume, rb, steps = evaluate_prefix(image, max_steps)
+    stats = {'folded_instructions': steps, 'resume': resume, 'stub_size': 0}
+    if steps == 0:
+        return image, stats
+    halts = decode(image, resume) is not None and image[resume] == 99
+    live = set(observed)
+    code = set()
+    patched = set()
+    if not halts:
+        # the prefix may stop inside a subroutine, so every call continuation is a root too
+        roots = {resume} | {ret for _, ret in ControlFlowGraph(image).calls.values()}
+        instructions = {}
+        for root in roots:
+            cfg = ControlFlowGraph(image, entry=root)
+            if any(block.indirect for block in cfg.blocks.values()):
+                raise OptimizeError("reachable code has computed jumps, cannot prove the stub is dead")
+            instructions.update(cfg.instructions)
+        # Live cells are the POSITION operands read by reachable code. Relative operands
+        # are assumed to stay above the stub (compiled code keeps its stack past the end of
+        # the program), which holds as long as rb only moves by constants; that is not
+        # proven any further, so an arb that takes rb from memory is refused.
+        for instruction in instructions.values():
+            code.update(range(instruction.address, instruction.next_address))
+            if instruction.opcode == 9 and instruction.modes[0] != PMODE.IMMEDIATE:
+                raise OptimizeError(f"rb is loaded from memory at {instruction.address}, cannot bound it")
+            num_inputs = len(instruction.params) - (1 if instruction.stores_result else 0)
+            for p, mode in zip(instruction.params[:num_inputs], instruction.modes):
+                if mode == PMODE.POSITION:
+                    live.add(p)
+        # Code that rewrites its own operands (day 13 patches the address operands of its
+        # screen reads and writes) reaches cells the scan above never sees. A patch into
+        # the stub area is refused; addresses computed into patched operands are assumed to
+        # stay above the stub, like relative ones, which day 13's (y * 40 + x + 639) does.
+        for instruction in instructions.values():
+            if instruction.stores_result and instruction.modes[-1] == PMODE.POSITION:
+                if instruction.params[-1] in code:
+                    patched.add(instruction.params[-1])
+    stub = build_stub(image, resume, rb, halts, live, code)
+    if any(address < len(stub) for address in patched):
+        raise OptimizeError(f"reachable code patches cells {sorted(patched)} inside the stub")
+    image[:len(stub)] = stub
+    if halts:
+        # nothing runs after the stub, only the observed cells have to stay in place
+        image = image[:max(len(stub), max(observed, default=-1) + 1)]
+    stats['stub_size'] = len(stub)
+    stats['size'] = len(image)
+    return image, stats
+
+
+# programs whose optimized form must produce the same outputs as the original
+CHECKS = [
+    # prefix ends 3 cells before where the program resumes, the stub must not fall short
+    ([1105, 1, 10, 0, 1106, 0, 20, 4, 1, 99, 1101, 40, 2, 1, 1105, 1, 7, 0, 0, 0, 104, 666, 99], {}, ()),
+]
+
+
+def check():
+    from day9p1 import OpMachine
+    from intcodereplay import replaying
+
+    def outputs(program):
+        o = replaying(OpMachine)(program[:], [])
+        o.run_program()
+        return o.output_buffer
+
+    for program, patches, observed in CHECKS:
+        original = program[:]
+        for address, value in patches.items():
+            original[address] = value
+        optimized, _ = optimize(program, patches, observed)
+        expected, got = outputs(original), outputs(optimized)
+        if expected != got:
+            raise AssertionError(f"{program}: optimized outputs {got}, original {expected}")
+    print(f"{len(CHECKS)} checks ok")
+
+
+def main():
+    if sys.argv[1:] == ['check']:
+        check()
+        return
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} <day module> [address=value ...] [observe=address ...]")
+        sys.exit(1)
+    program = importlib.import_module(sys.argv[1]).PROGRAM[:]
+    patches = {}
+    observed = []
+    for arg in sys.argv[2:]:
+        key, value = arg.split('=')
+        if key == 'observe':
+            observed.append(int(value))
+        else:
+            patches[int(key)] = int(value)
+    try:
+        optimized, stats = optimize(program, patches, observed or (0,))
+    except OptimizeError as ex:
+        print(f"cannot optimize: {ex}", file=sys.stderr)
+        sys.exit(1)
+    print(stats, file=sys.stderr)
+    print(f"PROGRAM = [{','.join(str(x) for x in optimized)}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# 2019 advent of code intcode input recording and replay
+#
+# usage: python intcodereplay.py record <day module> <file> [input values...]
+#        python intcodereplay.py replay <day module> <file>
+#   e.g. python intcodereplay.py record day13p2 breakout.inputs
+#        python intcodereplay.py replay day13p2 breakout.inputs
+#        python intcodereplay.py record day5p2 diagnostic.inputs 5
+#
+# Recording wraps the machine's own input op (joystick autopilot, robot camera, input()
+# prompt, ...) and logs each value it hands to the program. Input values given on the
+# command line are handed over first, before the machine's own input op is asked. Replay
+# feeds the recorded values back with every device (game_screen, io_robot) detached,
+# output only buffered and the halt op silent, so a whole session runs at raw VM speed.
+# note: day13p2curses starts curses at import time and cannot be used here.
+import sys
+import importlib
+from dataclasses import replace
+from time import perf_counter
+
+
+MAGIC = b'ICIN'
+DEVICES = ('game_screen', 'io_robot')
+
+
+def encode_values(values: list) -> bytes:
+    # zigzag + LEB128 varints, a joystick move or small input is a single byte
+    out = bytearray(MAGIC)
+    for value in values:
+        value = (value << 1) ^ -(value < 0)
+        while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_values(data: bytes) -> list:
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not an intcode input recording")
+    values = []
+    value = 0
+    shift = 0
+    for byte in data[len(MAGIC):]:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append((value >> 1) ^ -(value & 1))
+        value = 0
+        shift = 0
+    return values
+
+
+def save_recording(path: str, values: list):
+    with open(path, 'wb') as f:
+        f.write(encode_values(values))
+
+
+def load_recording(path: str) -> list:
+    with open(path, 'rb') as f:
+        return decode_values(f.read())
+
+
+def recording(machine_cls):
+    # subclass of machine_cls that logs every input value its program consumes
+    base_get_input = machine_cls.OPS[3].func
+
+    class RecordingOpMachine(machine_cls):
+
+        def __init__(self, *args, seed_inputs=(), **kwargs):
+            super().__init__(*args, **kwargs)
+            self.recorded_inputs = []
+            self._seed_inputs = iter(seed_inputs)
+
+        def get_input(self, *args) -> int:
+            value = next(self._seed_inputs, None)
+            if value is None:
+                value = base_get_input(self, *args)
+            if value is not None:
+                self.recorded_inputs.append(value)
+            return value
+
+        OPS = {**machine_cls.OPS, 3: replace(machine_cls.OPS[3], func=get_input)}
+
+    return RecordingOpMachine
+
+
+def replaying(machine_cls):
+    # subclass of machine_cls that takes its input from a recording and detaches devices
+    class ReplayOpMachine(machine_cls):
+
+        def __init__(self, program: list, inputs: list):
+            super().__init__(program)
+            for device in DEVICES:
+                if hasattr(self, device):
+                    setattr(self, device, None)
+            self.output_buffer = []
+            self._inputs = iter(inputs)
+
+        def get_input(self, *args) -> int:
+            try:
+                return next(self._inputs)
+            except StopIteration:
+                raise RuntimeError(f"recording exhausted at pc {self.pc}")
+
+        def send_output(self, a: int):
+            self.output_buffer.append(a)
+
+        def complete(self, *args):
+            # only the machine state, whatever the module's own halt op prints or draws
+            if hasattr(self, 'state'):
+                self.state = type(self.state).complete
+
+        OPS = {
+            **machine_cls.OPS,
+            3: replace(machine_cls.OPS[3], func=get_input),
+            4: replace(machine_cls.OPS[4], func=send_output),
+            99: replace(machine_cls.OPS[99], func=complete),
+        }
+
+    return ReplayOpMachine
+
+
+def main():
+    if len(sys.argv) < 4 or sys.argv[1] not in ('record', 'replay'):
+        print(f"usage: {sys.argv[0]} record|replay <day module> <file> [input values...]")
+        sys.exit(1)
+    command, module_name, path = sys.argv[1:4]
+    module = importlib.import_module(module_name)
+    start = perf_counter()
+    if command == 'record':
+        o = recording(module.OpMachine)(module.PROGRAM[:], seed_inputs=[int(x) for x in sys.argv[4:]])
+        o.run_program()
+        save_recording(path, o.recorded_inputs)
+        print(f"recorded {len(o.recorded_inputs)} inputs in {perf_counter() - start:.3f}s")
+    else:
+        inputs = load_recording(path)
+        o = replaying(module.OpMachine)(module.PROGRAM[:], inputs)
+        o.run_program()
+        print(f"replayed {len(inputs)} inputs in {perf_counter() - start:.3f}s")
+        print(f"{len(o.output_buffer)} outputs, last: {o.output_buffer[-1] if o.output_buffer else None}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+# 2019 advent of code day 6 orbit map as an interned integer graph
+#
+# Body names are interned to ints in load order and the whole map is a single
+# array('i') of parent ids (-1 for a body orbiting nothing), owned by the graph instance
+# so several maps can be loaded side by side. OrbitNode is a small __slots__ view for
+# when a body needs to be handled as an object.
+#
+# usage: python orbitgraph.py [--stream] [--save out.orb] [map file or .orb file]
+# With --stream the map is fed in one orbit at a time through add_orbit, which keeps the
+# total orbit count up to date from subtree sizes instead of recounting the whole map.
+#
+# --save writes the map in a binary form that MappedOrbitGraph opens with mmap, without
+# parsing anything: a header, then int32 arrays (native byte order) for the name offsets,
+# the body ids in name order, parents, depths and jump pointers, then the utf-8 names.
+# Jump pointers are the skew binary ones (each body points either at its parent or a
+# long way up, depending only on its depth) so depth and common ancestor queries take
+# O(log n) steps straight on the mapped arrays.
+import mmap
+import struct
+import sys
+from array import array
+
+
+NO_PARENT = -1
+
+MAGIC = b'ORBM'
+HEADER = struct.Struct('=4sIqQ')  # magic, bodies, total orbits, name blob size
+
+
+class OrbitNode:
+    __slots__ = ('graph', 'id')
+
+    def __init__(self, graph, id: int):
+        self.graph = graph
+        self.id = id
+
+    def __repr__(self):
+        parent = self.parent
+        return f"{parent.name}){self.name}" if parent else self.name
+
+    def __eq__(self, other):
+        return isinstance(other, OrbitNode) and self.graph is other.graph and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    @property
+    def name(self) -> str:
+        return self.graph.names[self.id]
+
+    @property
+    def parent(self):
+        p = self.graph.parent[self.id]
+        return None if p == NO_PARENT else OrbitNode(self.graph, p)
+
+    @property
+    def depth(self) -> int:
+        return self.graph.depth(self.id)
+
+    def orbits(self):
+        # every body this one orbits, directly or not, nearest first
+        for p in self.graph.ancestors(self.id):
+            yield OrbitNode(self.graph, p)
+
+
+class OrbitGraph:
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.parent = array('i')
+        self._depths = None
+        self._sizes = None  # subtree sizes and total orbits, kept once add_orbit is used
+        self._total = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    def intern(self, name: str) -> int:
+        id = self.ids.get(name)
+        if id is None:
+            id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.parent.append(NO_PARENT)
+            self._depths = None
+            if self._sizes is not None:
+                self._sizes.append(1)
+        return id
+
+    def node(self, name: str) -> OrbitNode:
+        return OrbitNode(self, self.ids[name])
+
+    @classmethod
+    def from_str(cls, text: str):
+        # whole map at once: one split for every entry, one pass to intern the names
+        graph = cls()
+        entries = text.split()
+        if text.count(')') == len(entries):
+            tokens = text.replace(')', ' ').split()
+        else:
+            tokens = []
+            for entry in entries:
+                if ')' in entry:
+                    tokens.extend(entry.split(')'))
+                else:
+                    graph.intern(entry)
+        for name in dict.fromkeys(tokens):
+            graph.intern(name)
+        ids = list(map(graph.ids.__getitem__, tokens))
+        parent = graph.parent
+        for p, c in zip(ids[::2], ids[1::2]):
+            parent[c] = p
+        return graph
+
+    @classmethod
+    def from_file(cls, path: str):
+        with open(path, 'rt') as f:
+            return cls.from_str(f.read())
+
+    def add_orbit(self, parent_name: str, child_name: str):
+        # child_name now orbits parent_name, either body may be new and child_name may
+        # already orbit something else. Only the two parent chains are walked: the child's
+        # subtree moves by the change in its depth, so the total moves by that times its size.
+        if self._sizes is None:
+            self._start_tracking()
+        p, c = self.intern(parent_name), self.intern(child_name)
+        parent, sizes = self.parent, self._sizes
+        old = parent[c]
+        if old == p:
+            return
+        chain = []
+        a = p
+        while a != NO_PARENT:
+            if a == c:
+                raise ValueError(f"{parent_name}){child_name} would make an orbit cycle")
+            chain.append(a)
+            a = parent[a]
+        for a in chain:
+            sizes[a] += sizes[c]
+        new_depth = len(chain)
+        old_depth = 0
+        a = old
+        while a != NO_PARENT:
+            sizes[a] -= sizes[c]
+            old_depth += 1
+            a = parent[a]
+        self._total += (new_depth - old_depth) * sizes[c]
+        parent[c] = p
+        self._depths = None
+
+    def _start_tracking(self):
+        depths = self.depths()
+        if len(depths) != len(self.parent):
+            raise RuntimeError("cached orbit depths are out of step with the map")
+        sizes = array('i', [1]) * len(self.parent)
+        for id in sorted(range(len(depths)), key=depths.__getitem__, reverse=True):
+            if self.parent[id] != NO_PARENT:
+                sizes[self.parent[id]] += sizes[id]
+        self._sizes = sizes
+        self._total = sum(depths)
+
+    def ancestors(self, id: int):
+        p = self.parent[id]
+        while p != NO_PARENT:
+            yield p
+            p = self.parent[p]
+
+    def depths(self) -> array:
+        # orbit count of every body; each parent chain is walked only as far as the first
+        # body whose depth is already known, so the whole map is O(n)
+        if self._depths is not None:
+            return self._depths
+        parent = self.parent
+        depths = array('i', [-1]) * len(parent)
+        for id in range(len(parent)):
+            chain = []
+            p = id
+            while p != NO_PARENT and depths[p] < 0:
+                chain.append(p)
+                p = parent[p]
+            depth = -1 if p == NO_PARENT else depths[p]
+            for c in reversed(chain):
+                depth += 1
+                depths[c] = depth
+        self._depths = depths
+        return depths
+
+    def depth(self, id: int) -> int:
+        return self.depths()[id]
+
+    def total_orbits(self) -> int:
+        return sum(self.depths()) if self._total is None else self._total
+
+    def common_ancestor(self, a: int, b: int) -> int:
+        # deepest body that both a and b are or orbit, NO_PARENT if they are unrelated
+        depths = self.depths()
+        parent = self.parent
+        while depths[a] > depths[b]:
+            a = parent[a]
+        while depths[b] > depths[a]:
+            b = parent[b]
+        while a != b:
+            a, b = parent[a], parent[b]
+        return a
+
+    def transfer_distance(self, name1: str, name2: str) -> int:
+        # orbital transfers between the bodies name1 and name2 are orbiting
+        pa, pb = self.parent[self.ids[name1]], self.parent[self.ids[name2]]
+        if pa == NO_PARENT or pb == NO_PARENT:
+            return -1
+        common = self.common_ancestor(pa, pb)
+        if common == NO_PARENT:
+            return -1
+        depths = self.depths()
+        return depths[pa] + depths[pb] - 2 * depths[common]
+
+    def save(self, path: str):
+        depths = self.depths()
+        encoded = [name.encode() for name in self.names]
+        offsets = array('i', [0])
+        for name in encoded:
+            offsets.append(offsets[-1] + len(name))
+        jumps = array('i', range(len(self)))
+        for id in sorted(range(len(self)), key=depths.__getitem__):
+            jumps[id] = jump_pointer(self.parent[id], self.parent, depths, jumps)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(self), self.total_orbits(), offsets[-1]))
+            f.write(offsets)
+            f.write(array('i', sorted(range(len(self)), key=self.names.__getitem__)))
+            f.write(self.parent)
+            f.write(depths)
+            f.write(jumps)
+            f.write(b''.join(encoded))
+
+
+def jump_pointer(p: int, parent, depths, jumps) -> int:
+    # skew binary jump for a body orbiting p: skip two equal jumps at once, else just p
+    if p == NO_PARENT:
+        return NO_PARENT
+    j = jumps[p]
+    if parent[p] != NO_PARENT and depths[p] - depths[j] == depths[j] - depths[jumps[j]]:
+        return jumps[j]
+    return p
+
+
+class MappedOrbitGraph:
+    # read only orbit map on a file written by OrbitGraph.save, opening it costs the same
+    # whatever the size of the map
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, count, self.total, blob_size = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an orbit map")
+        self.count = count
+        start = HEADER.size
+        sections = []
+        for size in (count + 1, count, count, count, count):
+            sections.append(view[start : start + 4 * size].cast('i'))
+            start += 4 * size
+        self.offsets, self.sorted_ids, self.parent, self.depth, self.jump = sections
+        self.blob = view[start : start + blob_size]
+        self._views = sections + [self.blob, view]
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) != NO_PARENT
+
+    def name(self, id: int) -> str:
+        return bytes(self.blob[self.offsets[id] : self.offsets[id + 1]]).decode()
+
+    def find(self, name: str) -> int:
+        # binary search of the names, NO_PARENT if there is no such body
+        key = name.encode()
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            id = self.sorted_ids[mid]
+            if bytes(self.blob[self.offsets[id] : self.offsets[id + 1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            id = self.sorted_ids[lo]
+            if self.blob[self.offsets[id] : self.offsets[id + 1]] == key:
+                return id
+        return NO_PARENT
+
+    def id_of(self, name: str) -> int:
+        # like find, but an unknown name is a KeyError as it is for OrbitGraph.ids
+        id = self.find(name)
+        if id == NO_PARENT:
+            raise KeyError(name)
+        return id
+
+    def total_orbits(self) -> int:
+        return self.total
+
+    def ancestor_at(self, id: int, depth: int) -> int:
+        # the body id orbits (or id itself) that sits at the given depth
+        jump, parent, depths = self.jump, self.parent, self.depth
+        while depths[id] > depth:
+            id = jump[id] if depths[jump[id]] >= depth else parent[id]
+        return id
+
+    def common_ancestor(self, a: int, b: int) -> int:
+        # deepest body that both a and b are or orbit, NO_PARENT if they are unrelated
+        depth = min(self.depth[a], self.depth[b])
+        a, b = self.ancestor_at(a, depth), self.ancestor_at(b, depth)
+        jump, parent = self.jump, self.parent
+        while a != b:
+            if parent[a] == NO_PARENT:
+                return NO_PARENT
+            # bodies at the same depth jump the same distance
+            if jump[a] != jump[b]:
+                a, b = jump[a], jump[b]
+            else:
+                a, b = parent[a], parent[b]
+        return a
+
+    def transfer_distance(self, name1: str, name2: str) -> int:
+        pa, pb = self.parent[self.id_of(name1)], self.parent[self.id_of(name2)]
+        if pa == NO_PARENT or pb == NO_PARENT:
+            return -1
+        common = self.common_ancestor(pa, pb)
+        if common == NO_PARENT:
+            return -1
+        return self.depth[pa] + self.depth[pb] - 2 * self.depth[common]
+
+
+def is_mapped(path: str) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def main():
+    args = sys.argv[1:]
+    save_path = None
+    if '--save' in args:
+        i = args.index('--save')
+        save_path = args[i + 1]
+        del args[i : i + 2]
+    args = [arg for arg in args if arg != '--stream']
+    path = args[0] if args else 'day6input.txt'
+    if is_mapped(path):
+        graph = MappedOrbitGraph(path)
+    elif '--stream' in sys.argv:
+        graph = OrbitGraph()
+        with open(path, 'rt') as f:
+            for line in f:
+                if ')' in line:
+                    graph.add_orbit(*line.strip().split(')'))
+    else:
+        graph = OrbitGraph.from_file(path)
+    print(graph.total_orbits())
+    if 'YOU' in graph and 'SAN' in graph:
+        print(graph.transfer_distance('YOU', 'SAN'))
+    if save_path:
+        graph.save(save_path)
+
+
+if __name__ == "__main__":
+    main()
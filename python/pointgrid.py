@@ -0,0 +1,278 @@
+# 2019 advent of code shared 2d point grid (days 3, 10, 11 and 13)
+#
+# SparseGrid  dict keyed by packed ints (same packing as the day 11 hull)
+# DenseGrid   bytearray with an origin offset that grows in every direction, values
+#             0 - 254 (anything else is a ValueError)
+# FrameBuffer DenseGrid anchored at 0, 0 for the day 13 screen
+# PointGrid   starts sparse and switches to dense once the points fill enough of their
+#             bounding box, or back to sparse if the box gets too empty
+#
+# All of them track their bounding box as points are set and share the same api:
+# set/get/in/len/items, neighbors, line and render.
+from math import gcd
+
+
+COORD_OFFSET = 1 << 31
+
+NEIGHBORS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+DIAGONAL_NEIGHBORS = NEIGHBORS + ((1, 1), (-1, 1), (-1, -1), (1, -1))
+
+
+def pack(x: int, y: int) -> int:
+    return ((x + COORD_OFFSET) << 32) | (y + COORD_OFFSET)
+
+
+def unpack(key: int) -> (int, int):
+    return (key >> 32) - COORD_OFFSET, (key & 0xffffffff) - COORD_OFFSET
+
+
+class BaseGrid:
+
+    def __init__(self):
+        self.min_x = self.min_y = None
+        self.max_x = self.max_y = None
+
+    def _extend(self, x: int, y: int):
+        if self.min_x is None:
+            self.min_x = self.max_x = x
+            self.min_y = self.max_y = y
+            return
+        if x < self.min_x:
+            self.min_x = x
+        elif x > self.max_x:
+            self.max_x = x
+        if y < self.min_y:
+            self.min_y = y
+        elif y > self.max_y:
+            self.max_y = y
+
+    @property
+    def bounds(self):
+        return self.min_x, self.min_y, self.max_x, self.max_y
+
+    @property
+    def area(self) -> int:
+        if self.min_x is None:
+            return 0
+        return (self.max_x - self.min_x + 1) * (self.max_y - self.min_y + 1)
+
+    def __contains__(self, point) -> bool:
+        return self.get(*point) is not None
+
+    def neighbors(self, x: int, y: int, diagonal: bool = False):
+        # ((x, y), value) for every set neighbor
+        for dx, dy in DIAGONAL_NEIGHBORS if diagonal else NEIGHBORS:
+            value = self.get(x + dx, y + dy)
+            if value is not None:
+                yield (x + dx, y + dy), value
+
+    def line(self, x0: int, y0: int, x1: int, y1: int):
+        # ((x, y), value) for every set point strictly between the two end points on the
+        # straight line joining them, nearest first (what blocks line of sight on day 10)
+        dx, dy = x1 - x0, y1 - y0
+        steps = gcd(dx, dy)
+        if steps == 0:
+            return
+        sx, sy = dx // steps, dy // steps
+        for i in range(1, steps):
+            value = self.get(x0 + i * sx, y0 + i * sy)
+            if value is not None:
+                yield (x0 + i * sx, y0 + i * sy), value
+
+    def row_values(self, y: int) -> list:
+        return [self.get(x, y) for x in range(self.min_x, self.max_x + 1)]
+
+    def render(self, table: dict, empty: str = ' ', flip_y: bool = False) -> str:
+        # one string for the whole bounding box, table maps values to characters
+        if self.min_x is None:
+            return ''
+        ys = range(self.max_y, self.min_y - 1, -1) if flip_y else range(self.min_y, self.max_y + 1)
+        return '\n'.join(''.join(empty if v is None else table[v] for v in self.row_values(y)) for y in ys)
+
+
+class SparseGrid(BaseGrid):
+
+    def __init__(self):
+        super().__init__()
+        self.cells = {}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def set(self, x: int, y: int, value: int):
+        self.cells[pack(x, y)] = value
+        self._extend(x, y)
+
+    def get(self, x: int, y: int, default=None):
+        return self.cells.get(pack(x, y), default)
+
+    def items(self):
+        for key, value in self.cells.items():
+            yield unpack(key), value
+
+
+class DenseGrid(BaseGrid):
+
+    UNSET = 0xff
+
+    def __init__(self, origin_x: int = 0, origin_y: int = 0, width: int = 16, height: int = 16):
+        super().__init__()
+        self.origin_x = origin_x  # coordinates of data[0]
+        self.origin_y = origin_y
+        self.width = width
+        self.height = height
+        self.data = bytearray([self.UNSET]) * (width * height)
+        self.filled = 0
+        self.counts = [0] * self.UNSET  # set cells per value
+
+    def __len__(self):
+        return self.filled
+
+    def _grow(self, x: int, y: int):
+        # at least double along each axis that overflows, keeping existing rows in place
+        left = max(self.origin_x - x, self.width if x < self.origin_x else 0, 0)
+        right = max(x - (self.origin_x + self.width - 1), self.width if x >= self.origin_x + self.width else 0, 0)
+        top = max(self.origin_y - y, self.height if y < self.origin_y else 0, 0)
+        bottom = max(y - (self.origin_y + self.height - 1), self.height if y >= self.origin_y + self.height else 0, 0)
+        width = self.width + left + right
+        height = self.height + top + bottom
+        data = bytearray([self.UNSET]) * (width * height)
+        for row in range(self.height):
+            start = (row + top) * width + left
+            data[start : start + self.width] = self.data[row * self.width : (row + 1) * self.width]
+        self.origin_x -= left
+        self.origin_y -= top
+        self.width, self.height, self.data = width, height, data
+
+    def set(self, x: int, y: int, value: int):
+        if not 0 <= value < self.UNSET:
+            raise ValueError(f"{value} can't be stored in a dense grid (0 - {self.UNSET - 1})")
+        i, j = x - self.origin_x, y - self.origin_y
+        if not (0 <= i < self.width and 0 <= j < self.height):
+            self._grow(x, y)
+            i, j = x - self.origin_x, y - self.origin_y
+        index = j * self.width + i
+        old = self.data[index]
+        if old == self.UNSET:
+            self.filled += 1
+        else:
+            self.counts[old] -= 1
+        self.counts[value] += 1
+        self.data[index] = value
+        self._extend(x, y)
+
+    def count(self, value: int) -> int:
+        return self.counts[value]
+
+    def get(self, x: int, y: int, default=None):
+        i, j = x - self.origin_x, y - self.origin_y
+        if 0 <= i < self.width and 0 <= j < self.height:
+            value = self.data[j * self.width + i]
+            if value != self.UNSET:
+                return value
+        return default
+
+    def items(self):
+        for index, value in enumerate(self.data):
+            if value != self.UNSET:
+                yield (self.origin_x + index % self.width, self.origin_y + index // self.width), value
+
+    def row_bytes(self, y: int) -> bytes:
+        start = (y - self.origin_y) * self.width + self.min_x - self.origin_x
+        return bytes(self.data[start : start + self.max_x - self.min_x + 1])
+
+    def row_values(self, y: int) -> list:
+        return [None if v == self.UNSET else v for v in self.row_bytes(y)]
+
+    def render(self, table: dict, empty: str = ' ', flip_y: bool = False) -> str:
+        if self.min_x is None:
+            return ''
+        translation = {**table, self.UNSET: empty}
+        ys = range(self.max_y, self.min_y - 1, -1) if flip_y else range(self.min_y, self.max_y + 1)
+        return '\n'.join(self.row_bytes(y).decode('latin-1').translate(translation) for y in ys)
+
+
+class FrameBuffer(DenseGrid):
+    # the day 13 screen: tiles drawn at non-negative coordinates, counted per tile value
+
+    UNDRAWN = DenseGrid.UNSET
+
+    def __init__(self, width: int = 64, height: int = 32):
+        super().__init__(0, 0, width, height)
+
+    def set(self, x: int, y: int, tile: int):
+        if x < 0 or y < 0:
+            raise IndexError(f"({x}, {y}) is off screen")
+        super().set(x, y, tile)
+
+    def rows(self):
+        # every row from 0 up to the furthest drawn cell, as raw tile bytes
+        if self.max_x is None:
+            return
+        for y in range(self.max_y + 1):
+            start = y * self.width
+            yield self.data[start : start + self.max_x + 1]
+
+
+class PointGrid(BaseGrid):
+
+    DENSE_AT = 0.25  # switch to dense storage once points fill this much of the box
+    SPARSE_AT = 0.05  # and back to sparse below this
+    CHECK_EVERY = 1024
+
+    min_x = property(lambda self: self.storage.min_x)
+    min_y = property(lambda self: self.storage.min_y)
+    max_x = property(lambda self: self.storage.max_x)
+    max_y = property(lambda self: self.storage.max_y)
+
+    def __init__(self):
+        self._sets = 0
+        self._use(SparseGrid())
+
+    def _use(self, storage: BaseGrid):
+        self.storage = storage
+        self.dense = isinstance(storage, DenseGrid)
+        # reads go straight to the storage rather than through this wrapper
+        self.get = storage.get
+        self.items = storage.items
+        self.row_values = storage.row_values
+        self.render = storage.render
+
+    def __len__(self):
+        return len(self.storage)
+
+    def set(self, x: int, y: int, value: int):
+        if self.dense and not 0 <= value < DenseGrid.UNSET:
+            self._convert(SparseGrid())
+        self.storage.set(x, y, value)
+        self._sets += 1
+        if self._sets % self.CHECK_EVERY == 0:
+            self._rebalance()
+
+    def _convert(self, storage: BaseGrid):
+        for (x, y), value in self.storage.items():
+            storage.set(x, y, value)
+        self._use(storage)
+
+    def _rebalance(self):
+        if not self.area:
+            return
+        density = len(self.storage) / self.area
+        if not self.dense and density >= self.DENSE_AT:
+            if all(0 <= v < DenseGrid.UNSET for _, v in self.storage.items()):
+                self._convert(DenseGrid(
+                    self.min_x, self.min_y, self.max_x - self.min_x + 1, self.max_y - self.min_y + 1
+                ))
+        elif self.dense and density < self.SPARSE_AT:
+            self._convert(SparseGrid())
+
+    @classmethod
+    def from_lines(cls, lines, values: dict, skip: str = ''):
+        # text grid, x across and y down, `values` maps characters to stored values
+        grid = cls()
+        for y, line in enumerate(lines):
+            for x, ch in enumerate(line):
+                if ch not in skip:
+                    grid.set(x, y, values[ch])
+        grid._rebalance()
+        return grid
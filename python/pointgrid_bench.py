@@ -0,0 +1,142 @@
+# 2019 advent of code point grid benchmark
+#
+# usage: python pointgrid_bench.py
+# Times each day's access pattern on the storage that day used originally against
+# SparseGrid, DenseGrid and the adaptive PointGrid.
+import random
+from dataclasses import dataclass
+from time import perf_counter
+
+from pointgrid import SparseGrid, DenseGrid, PointGrid
+
+
+@dataclass
+class Grid:
+    x: int
+    y: int
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+
+class TupleDict:
+    # the dict-of-tuples / dict-of-Grid storage the days started from
+    def __init__(self, key=lambda x, y: (x, y)):
+        self.key = key
+        self.cells = {}
+
+    def set(self, x, y, value):
+        self.cells[self.key(x, y)] = value
+
+    def get(self, x, y, default=None):
+        return self.cells.get(self.key(x, y), default)
+
+    def render(self, table, empty=' ', flip_y=False):
+        xs = [k[0] if isinstance(k, tuple) else k.x for k in self.cells]
+        ys = [k[1] if isinstance(k, tuple) else k.y for k in self.cells]
+        return '\n'.join(
+            ''.join(table[self.get(x, y)] if self.get(x, y) is not None else empty for x in range(min(xs), max(xs) + 1))
+            for y in range(min(ys), max(ys) + 1)
+        )
+
+
+MOVES = {'R': (1, 0), 'L': (-1, 0), 'U': (0, 1), 'D': (0, -1)}
+
+
+def day3(grid):
+    # mark one wire, then probe every cell of the other
+    with open('day3input.txt') as f:
+        wires = [line.strip().split(',') for line in f.readlines()]
+    for i, wire in enumerate(wires):
+        x = y = 0
+        hits = 0
+        for d in wire:
+            dx, dy = MOVES[d[0]]
+            for _ in range(int(d[1:])):
+                x += dx
+                y += dy
+                if i == 0:
+                    grid.set(x, y, 1)
+                elif grid.get(x, y) is not None:
+                    hits += 1
+    return hits
+
+
+def day10(grid):
+    # asteroid field, count line of sight between every pair
+    rng = random.Random(10)
+    size = 24
+    asteroids = [(x, y) for y in range(size) for x in range(size) if rng.random() < 0.4]
+    for x, y in asteroids:
+        grid.set(x, y, 1)
+    visible = 0
+    for x0, y0 in asteroids:
+        for x1, y1 in asteroids:
+            if (x0, y0) != (x1, y1) and next(lines(grid, x0, y0, x1, y1), None) is None:
+                visible += 1
+    return visible
+
+
+def lines(grid, x0, y0, x1, y1):
+    if hasattr(grid, 'line'):
+        return grid.line(x0, y0, x1, y1)
+    from math import gcd
+    steps = gcd(x1 - x0, y1 - y0)
+    sx, sy = (x1 - x0) // steps, (y1 - y0) // steps
+    return ((x0 + i * sx, y0 + i * sy) for i in range(1, steps) if grid.get(x0 + i * sx, y0 + i * sy) is not None)
+
+
+def day11(grid):
+    # painting robot: read the square, paint it, turn, step
+    rng = random.Random(11)
+    x = y = 0
+    direction = 0
+    for _ in range(200000):
+        color = grid.get(x, y, 0)
+        grid.set(x, y, 1 - color if rng.random() < 0.5 else color)
+        direction = (direction + (1 if rng.random() < 0.5 else 3)) % 4
+        dx, dy = ((0, 1), (1, 0), (0, -1), (-1, 0))[direction]
+        x += dx
+        y += dy
+    return len(grid.render({0: '.', 1: '#'}, flip_y=True))
+
+
+def day13(grid):
+    # breakout screen: fill it, then many single tile updates and periodic renders
+    rng = random.Random(13)
+    for y in range(26):
+        for x in range(40):
+            grid.set(x, y, rng.randrange(5))
+    size = 0
+    for i in range(100000):
+        grid.set(rng.randrange(40), rng.randrange(26), rng.randrange(5))
+        if i % 2000 == 0:
+            size += len(grid.render({0: ' ', 1: '|', 2: '#', 3: '_', 4: 'o'}))
+    return size
+
+
+BASELINES = {
+    'day3': lambda: TupleDict(),
+    'day10': lambda: TupleDict(),
+    'day11': lambda: TupleDict(Grid),
+    'day13': lambda: TupleDict(Grid),
+}
+
+
+def main():
+    stores = [('original', None), ('sparse', SparseGrid), ('dense', DenseGrid), ('auto', PointGrid)]
+    print(f"{'pattern':8s}" + ''.join(f"{name:>12s}" for name, _ in stores))
+    for name, pattern in (('day3', day3), ('day10', day10), ('day11', day11), ('day13', day13)):
+        timings = []
+        results = set()
+        for _, cls in stores:
+            grid = BASELINES[name]() if cls is None else cls()
+            start = perf_counter()
+            results.add(pattern(grid))
+            timings.append(perf_counter() - start)
+        assert len(results) == 1, f"{name} storages disagree: {results}"
+        print(f"{name:8s}" + ''.join(f"{t:11.3f}s" for t in timings))
+
+
+if __name__ == "__main__":
+    main()